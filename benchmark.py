@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+性能基准测试
+
+包含微基准和压测两部分：
+    micro    热点函数的微基准（节假日查询、User-Agent 解析、时间信息），报告每次调用的纳秒数
+    memory   节假日数据加载后常驻的内存和每条查询结果新分配的内存（tracemalloc）
+    asgi     在进程内通过 ASGI 客户端压测每个接口，不经过网络
+    uvicorn  启动本地 uvicorn 进程，通过 HTTP 压测每个接口
+
+压测按固定并发数、固定请求数和固定的请求数据进行，报告 p50/p99 延迟、每秒请求数和服务进程的峰值内存，
+结果保存为 JSON。不同提交在同一台机器上的结果可以用 --compare 对比，找出性能退化。
+
+用法：
+    python benchmark.py                                   # 运行全部基准，结果写入 benchmark.json
+    python benchmark.py --mode micro,asgi --requests 200  # 只运行部分基准
+    python benchmark.py --output new.json --compare old.json --fail-threshold 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+import httpx
+
+# 仓库根目录，数据文件、快照和 git 信息都从这里解析，与运行时的工作目录无关
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+# 节假日数据目录
+HOLIDAY_DIR = os.path.join(ROOT_DIR, "holiday")
+# 压测时管理接口使用的令牌
+BENCHMARK_ADMIN_TOKEN = "benchmark"
+# 每个接口正式计时前的预热请求数
+WARMUP_REQUESTS = 50
+
+# 固定的测试数据，保证每次运行的请求完全相同
+SAMPLE_DATES = [date(2024, 1, 1) + timedelta(days=i * 7) for i in range(52)]
+SAMPLE_USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) "
+    "Version/17.1 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:121.0) Gecko/20100101 Firefox/121.0",
+    "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
+    "curl/8.4.0",
+]
+BATCH_DATES = [d.strftime("%Y-%m-%d") for d in SAMPLE_DATES] * 2
+ECHO_JSON = {"message": "benchmark", "items": [{"id": i, "name": f"item-{i}"} for i in range(100)]}
+ECHO_STREAM_BODY = bytes(range(256)) * 256  # 64KB
+
+ADMIN_HEADERS = {"X-Admin-Token": BENCHMARK_ADMIN_TOKEN}
+
+# (名称, 方法, 路径, 请求参数)，覆盖全部接口
+ROUTES: List[Tuple[str, str, str, Dict[str, Any]]] = [
+    ("root", "GET", "/", {}),
+    ("info", "GET", "/info", {"headers": {"User-Agent": SAMPLE_USER_AGENTS[0]}}),
+    ("ip", "GET", "/ip", {}),
+    ("headers", "GET", "/headers", {}),
+    ("user_agent", "GET", "/user-agent", {"headers": {"User-Agent": SAMPLE_USER_AGENTS[1]}}),
+    ("time", "GET", "/time", {}),
+    ("time_by_date", "GET", "/time/2024-10-01", {}),
+    ("solar_terms", "GET", "/solar-terms/2024", {}),
+    ("ready", "GET", "/ready", {}),
+    ("metrics", "GET", "/metrics", {}),
+    ("admin_status", "GET", "/admin/holiday/status", {"headers": ADMIN_HEADERS}),
+    ("admin_reload", "POST", "/admin/holiday/reload", {"headers": ADMIN_HEADERS}),
+    ("holiday_years", "GET", "/holiday/years", {}),
+    ("holiday_year", "GET", "/holiday/2024", {}),
+    ("holiday_check", "GET", "/holiday/check/2024-10-01", {}),
+    ("holiday_check_batch", "POST", "/holiday/check", {"json": BATCH_DATES}),
+    ("calendar", "GET", "/calendar", {"params": {"start": "2024-01-01", "end": "2024-12-31"}}),
+    ("calendar_ndjson", "GET", "/calendar", {"params": {"start": "2024-01-01", "end": "2024-12-31",
+                                                       "format": "ndjson"}}),
+    ("workday_add", "GET", "/workday/add", {"params": {"from": "2024-09-27", "n": 10}}),
+    ("workday_count", "GET", "/workday/count", {"params": {"start": "2024-01-01", "end": "2024-12-31"}}),
+    ("echo", "POST", "/echo", {"json": ECHO_JSON}),
+    ("echo_stream", "POST", "/echo", {"params": {"mode": "stream"}, "content": ECHO_STREAM_BODY,
+                                      "headers": {"Content-Type": "application/octet-stream"}}),
+]
+
+
+def require_years(available: List[int], required: List[int]):
+    """用例依赖的年份没有数据文件时直接退出，避免对空数据测出无意义的结果"""
+    missing = sorted(set(required) - set(available))
+    if missing:
+        sys.exit(f"❌ 未找到 {HOLIDAY_DIR} 中 {', '.join(map(str, missing))} 年的节假日数据，无法运行基准测试")
+
+
+def run_micro(repeat: int = 5) -> List[Dict[str, Any]]:
+    """
+    运行热点函数的微基准
+
+    每个用例在一次调用中处理一批固定输入，timeit 自动确定循环次数，重复若干轮后取最优值和中位数。
+
+    Args:
+        repeat: 重复轮数
+
+    Returns:
+        每个用例的结果
+    """
+    from holiday_loader import holiday_loader
+    from user_agent import parse_user_agent
+    from date_info import get_time_info
+
+    holiday_loader.preload()
+    years = sorted({d.year for d in SAMPLE_DATES})
+    require_years(holiday_loader.get_available_years(), years)
+
+    cases = [
+        ("HolidayLoader.is_holiday", len(SAMPLE_DATES),
+         lambda: [holiday_loader.is_holiday(d) for d in SAMPLE_DATES]),
+        ("HolidayLoader.get_holiday_info", len(SAMPLE_DATES),
+         lambda: [holiday_loader.get_holiday_info(d) for d in SAMPLE_DATES]),
+        ("HolidayLoader.get_year_holidays", len(years),
+         lambda: [holiday_loader.get_year_holidays(y) for y in years]),
+        ("parse_user_agent", len(SAMPLE_USER_AGENTS),
+         lambda: [parse_user_agent(ua) for ua in SAMPLE_USER_AGENTS]),
+        ("parse_user_agent[uncached]", len(SAMPLE_USER_AGENTS),
+         lambda: [parse_user_agent.__wrapped__(ua) for ua in SAMPLE_USER_AGENTS]),
+        ("get_time_info", 1, get_time_info),
+    ]
+
+    results = []
+    for name, batch, func in cases:
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()
+        per_op = [t / number / batch * 1e9 for t in timer.repeat(repeat=repeat, number=number)]
+        result = {
+            "name": name,
+            "best_ns": round(min(per_op), 1),
+            "median_ns": round(statistics.median(per_op), 1),
+            "ops_per_sec": round(1e9 / min(per_op)),
+            "loops": number * batch
+        }
+        print(f"  {name:<36} {result['best_ns']:>12.1f} ns/op  (中位数 {result['median_ns']:.1f})")
+        results.append(result)
+    return results
+
+
+def run_memory() -> List[Dict[str, Any]]:
+    """
+    测量节假日数据的内存占用和查询结果的内存分配
+
+    用 tracemalloc 统计 Python 堆内存：全部年份加载后常驻的内存（分别从 JSON 和快照加载，不含日历位图），
+    以及 get_holiday_info、get_year_holidays 返回的结果每条占用的内存。
+
+    Returns:
+        每项的结果
+    """
+    import gc
+    import tracemalloc
+    from holiday_loader import HolidayLoader, HOLIDAY_SNAPSHOT
+
+    results = []
+
+    def measure(name: str, func, count: int):
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        kept = func()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result = {
+            "name": name,
+            "count": count,
+            "retained_bytes": current - before,
+            "peak_bytes": peak - before,
+            "bytes_per_item": round((current - before) / count, 1)
+        }
+        print(f"  {name:<36} 常驻 {result['retained_bytes']:>10} B  峰值 {result['peak_bytes']:>10} B  "
+              f"每条 {result['bytes_per_item']:>8.1f} B")
+        results.append(result)
+        return kept
+
+    years = HolidayLoader(HOLIDAY_DIR).get_available_years()
+    require_years(years, [2024])
+    sources = [("json", None)]
+    snapshot_file = os.path.join(ROOT_DIR, HOLIDAY_SNAPSHOT)
+    if os.path.exists(snapshot_file):
+        sources.append(("snapshot", snapshot_file))
+    loader = None
+    for source, snapshot_path in sources:
+        def load_all():
+            new_loader = HolidayLoader(HOLIDAY_DIR, snapshot_path=snapshot_path)
+            for year in years:
+                new_loader.is_holiday(date(year, 1, 1))
+            return new_loader
+        loader = measure(f"HolidayLoader.years[{source}]", load_all, len(years))
+
+    dates = [date(2024, 1, 1) + timedelta(days=i) for i in range(366)]
+    measure("get_holiday_info", lambda: [loader.get_holiday_info(d) for d in dates], len(dates))
+    entries = sum(len(loader.get_year_holidays(year)) for year in years)
+    measure("get_year_holidays", lambda: [loader.get_year_holidays(year) for year in years], entries)
+    return results
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """最近秩法计算百分位数"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(len(sorted_values) * percent / 100 + 0.999999))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_load(client: httpx.AsyncClient, method: str, path: str, kwargs: Dict[str, Any],
+                   concurrency: int, total: int) -> Dict[str, Any]:
+    """
+    以固定并发数发送固定数量的请求
+
+    Args:
+        client: HTTP 客户端
+        method: 请求方法
+        path: 请求路径
+        kwargs: 传给 client.request 的参数
+        concurrency: 并发数
+        total: 请求总数
+
+    Returns:
+        请求数、错误数、每秒请求数和延迟百分位（毫秒）
+    """
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal errors, next_index
+        while next_index < total:
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                await response.aread()
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0
+    }
+
+
+async def run_routes(client: httpx.AsyncClient, concurrency_levels: List[int], total: int,
+                     rss_pid: Optional[int]) -> List[Dict[str, Any]]:
+    """按并发数逐个压测全部接口"""
+    results = []
+    for name, method, path, kwargs in ROUTES:
+        await run_load(client, method, path, kwargs, 1, WARMUP_REQUESTS)
+        for concurrency in concurrency_levels:
+            result = {"route": name, "method": method, "path": path, "concurrency": concurrency}
+            result.update(await run_load(client, method, path, kwargs, concurrency, total))
+            result["peak_rss_kb"] = peak_rss_kb(rss_pid)
+            print(f"  {name:<20} c={concurrency:<4} {result['rps']:>9.1f} req/s  "
+                  f"p50 {result['p50_ms']:>8.3f}ms  p99 {result['p99_ms']:>8.3f}ms  错误 {result['errors']}")
+            results.append(result)
+    return results
+
+
+def peak_rss_kb(pid: Optional[int] = None) -> Optional[int]:
+    """
+    获取进程的峰值常驻内存（KB）
+
+    Args:
+        pid: 进程号，为 None 时为当前进程
+
+    Returns:
+        峰值内存，无法获取时为 None
+    """
+    if pid is None:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 的 ru_maxrss 单位是字节，Linux 是 KB
+        return rss // 1024 if sys.platform == "darwin" else rss
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def benchmark_env() -> Dict[str, str]:
+    """压测用的环境变量：关闭数据目录监视，启用管理接口，开启 Server-Timing 和访问日志（写到空设备）"""
+    env = dict(os.environ)
+    env.update({"HOLIDAY_WATCH": "0", "ADMIN_TOKEN": BENCHMARK_ADMIN_TOKEN, "ACCESS_LOG_FILE": os.devnull})
+    # 计时功能默认关闭，压测时默认开启以保持与历史结果可比，可通过环境变量关闭
+    env.setdefault("SERVER_TIMING", "1")
+    env.setdefault("ACCESS_LOG", "1")
+    return env
+
+
+async def run_asgi(concurrency_levels: List[int], total: int) -> List[Dict[str, Any]]:
+    """在进程内通过 ASGI 客户端压测全部接口"""
+    os.environ.update(benchmark_env())
+    from main import app
+
+    transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 50000))
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            return await run_routes(client, concurrency_levels, total, None)
+
+
+async def run_uvicorn(concurrency_levels: List[int], total: int, port: int) -> List[Dict[str, Any]]:
+    """启动本地 uvicorn 单进程服务并通过 HTTP 压测全部接口"""
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+               "--log-level", "warning"]
+    server = subprocess.Popen(command, env=benchmark_env(), cwd=ROOT_DIR)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        await wait_ready(base_url, server)
+        limits = httpx.Limits(max_connections=max(concurrency_levels),
+                              max_keepalive_connections=max(concurrency_levels))
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            return await run_routes(client, concurrency_levels, total, server.pid)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+
+async def wait_ready(base_url: str, server: subprocess.Popen, timeout: float = 30):
+    """等待服务的就绪探针返回 200"""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn 启动失败，退出码 {server.returncode}")
+            try:
+                if (await client.get("/ready")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"uvicorn 在 {timeout} 秒内未就绪")
+
+
+def collect_meta(args: argparse.Namespace) -> Dict[str, Any]:
+    """记录运行环境，便于判断两次结果是否可比"""
+    from fast_json import JSON_ENGINE
+
+    def git(*command: str) -> Optional[str]:
+        try:
+            return subprocess.run(["git", *command], capture_output=True, text=True, check=True,
+                                  cwd=ROOT_DIR).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "json_engine": JSON_ENGINE,
+        "requests": args.requests,
+        "concurrency": args.concurrency_levels,
+        "warmup_requests": WARMUP_REQUESTS
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> int:
+    """
+    对比两次运行的结果
+
+    Args:
+        current: 本次结果
+        baseline: 基准结果
+        threshold: 退化阈值（百分比），大于 0 时统计超过阈值的退化项
+
+    Returns:
+        超过阈值的退化项数量
+    """
+    regressions = 0
+    print(f"\n📊 与 {baseline['meta'].get('commit')} 对比（正数表示变慢）:")
+
+    def report(label: str, old: float, new: float, higher_is_better: bool):
+        nonlocal regressions
+        if not old:
+            return
+        change = (old - new) / old * 100 if higher_is_better else (new - old) / old * 100
+        mark = ""
+        if threshold > 0 and change > threshold:
+            regressions += 1
+            mark = "  ⚠️"
+        print(f"  {label:<52} {old:>12.3f} -> {new:>12.3f}  {change:+7.1f}%{mark}")
+
+    old_micro = {item["name"]: item for item in baseline.get("micro", [])}
+    for item in current.get("micro", []):
+        if item["name"] in old_micro:
+            report(f"{item['name']} ns/op", old_micro[item["name"]]["best_ns"], item["best_ns"], False)
+
+    old_memory = {item["name"]: item for item in baseline.get("memory", [])}
+    for item in current.get("memory", []):
+        if item["name"] in old_memory:
+            report(f"{item['name']} bytes/item", old_memory[item["name"]]["bytes_per_item"],
+                   item["bytes_per_item"], False)
+
+    for mode in ("asgi", "uvicorn"):
+        old_routes = {(item["route"], item["concurrency"]): item for item in baseline.get(mode, [])}
+        for item in current.get(mode, []):
+            old = old_routes.get((item["route"], item["concurrency"]))
+            if old is None:
+                continue
+            label = f"{mode} {item['route']} c={item['concurrency']}"
+            report(f"{label} req/s", old["rps"], item["rps"], True)
+            report(f"{label} p99", old["p99_ms"], item["p99_ms"], False)
+    return regressions
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="API信息查看平台性能基准测试")
+    parser.add_argument("--mode", default="micro,memory,asgi,uvicorn", help="要运行的基准，逗号分隔：micro、memory、asgi、uvicorn")
+    parser.add_argument("--concurrency", default="1,16,64", help="压测并发数，逗号分隔")
+    parser.add_argument("--requests", type=int, default=500, help="每个接口在每个并发数下的请求数")
+    parser.add_argument("--port", type=int, default=8765, help="uvicorn 压测使用的端口")
+    parser.add_argument("--output", default="benchmark.json", help="结果输出文件")
+    parser.add_argument("--compare", help="与之对比的历史结果文件")
+    parser.add_argument("--fail-threshold", type=float, default=0,
+                        help="对比时任一指标退化超过该百分比则以非零状态退出，0 表示不检查")
+    args = parser.parse_args()
+    args.concurrency_levels = [int(value) for value in args.concurrency.split(",") if value.strip()]
+    modes = {value.strip() for value in args.mode.split(",") if value.strip()}
+    # 输出和对比文件按调用时的工作目录解析；应用内的相对路径（节假日数据、快照、IP库）按仓库根目录解析
+    args.output = os.path.abspath(args.output)
+    if args.compare:
+        args.compare = os.path.abspath(args.compare)
+    os.chdir(ROOT_DIR)
+
+    # 导入 main 之前设置环境变量，保证各部分使用相同的配置
+    os.environ.update(benchmark_env())
+    results: Dict[str, Any] = {"meta": collect_meta(args)}
+
+    if "micro" in modes:
+        print("⏱️  微基准:")
+        results["micro"] = run_micro()
+    if "memory" in modes:
+        print("\n🧠 内存占用:")
+        results["memory"] = run_memory()
+    if "uvicorn" in modes:
+        print(f"\n🌐 uvicorn 压测（每个并发数 {args.requests} 个请求）:")
+        results["uvicorn"] = asyncio.run(run_uvicorn(args.concurrency_levels, args.requests, args.port))
+    if "asgi" in modes:
+        print(f"\n🧪 进程内 ASGI 压测（每个并发数 {args.requests} 个请求）:")
+        results["asgi"] = asyncio.run(run_asgi(args.concurrency_levels, args.requests))
+    results["meta"]["client_peak_rss_kb"] = peak_rss_kb()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\n✅ 结果已保存到 {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.fail_threshold)
+        if regressions:
+            print(f"\n❌ {regressions} 项指标退化超过 {args.fail_threshold}%")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
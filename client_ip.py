@@ -0,0 +1,210 @@
+"""
+客户端真实IP解析
+
+只有直连对端是受信任代理时才读取代理头，并且只读取 TRUSTED_PROXY_HEADER 指定的一个头
+（X-Forwarded-For、RFC 7239 Forwarded 或 X-Real-IP，应与代理实际写入的头一致），其余两个头一律忽略：
+代理通常只追加自己写入的头，其他头由客户端原样带入，采信它们就等于允许客户端伪造地址。
+代理链从右向左跳过受信任代理，第一个不受信任的地址即为客户端地址。
+受信任代理以 CIDR 配置，启动时编译为 {前缀长度: 网络地址集合}，匹配时每个前缀长度只需一次集合查找。
+"""
+
+import ipaddress
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from timing import phase
+
+# 受信任代理的 CIDR 列表，逗号分隔；默认只信任本机。部署在负载均衡器或反向代理之后时应显式配置其地址段，
+# 不要信任整个私有网络，否则同一内网或容器网络中的任何客户端都能伪造代理头
+TRUSTED_PROXIES = os.getenv("TRUSTED_PROXIES", "127.0.0.0/8,::1/128")
+# 受信任代理写入客户端地址的请求头：x-forwarded-for、forwarded 或 x-real-ip
+TRUSTED_PROXY_HEADER = os.getenv("TRUSTED_PROXY_HEADER", "x-forwarded-for").strip().lower()
+# 解析结果缓存的最大条目数
+CLIENT_IP_CACHE_SIZE = int(os.getenv("CLIENT_IP_CACHE_SIZE", "4096"))
+
+# 可配置的代理头
+PROXY_HEADERS = ("x-forwarded-for", "forwarded", "x-real-ip")
+
+IPAddress = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+
+class TrustedProxies:
+    """受信任代理集合，按前缀长度分组的网络地址哈希表"""
+
+    def __init__(self, cidrs: Iterable[str]):
+        """
+        编译受信任代理列表
+
+        Args:
+            cidrs: CIDR 或单个IP地址，格式错误时抛出 ValueError
+        """
+        # IP版本 -> [(前缀长度, 掩码, 网络地址集合)]，前缀长度从长到短
+        self._tables: Dict[int, List[Tuple[int, int, Set[int]]]] = {4: [], 6: []}
+        groups: Dict[Tuple[int, int], Set[int]] = {}
+        for cidr in cidrs:
+            cidr = cidr.strip()
+            if not cidr:
+                continue
+            network = ipaddress.ip_network(cidr, strict=False)
+            groups.setdefault((network.version, network.prefixlen), set()).add(int(network.network_address))
+
+        for (version, prefixlen), networks in sorted(groups.items(), key=lambda item: -item[0][1]):
+            bits = 32 if version == 4 else 128
+            mask = ((1 << prefixlen) - 1) << (bits - prefixlen)
+            self._tables[version].append((prefixlen, mask, networks))
+
+    def __contains__(self, address: IPAddress) -> bool:
+        value = int(address)
+        for _, mask, networks in self._tables[address.version]:
+            if value & mask in networks:
+                return True
+        return False
+
+
+def parse_address(value: str) -> Optional[IPAddress]:
+    """
+    解析代理头中的一个地址
+
+    支持带端口的 IPv4（1.2.3.4:80）、带方括号的 IPv6（[2001:db8::1]:443）和带引号的值，
+    IPv4 映射的 IPv6 地址转换为 IPv4。
+
+    Args:
+        value: 地址字符串
+
+    Returns:
+        IP地址对象，无法解析（如 unknown、混淆标识）时为 None
+    """
+    value = value.strip().strip('"')
+    if value.startswith("["):
+        end = value.find("]")
+        if end < 0:
+            return None
+        value = value[1:end]
+    elif value.count(":") == 1:
+        value = value.split(":", 1)[0]
+    try:
+        address = ipaddress.ip_address(value)
+    except ValueError:
+        return None
+    if address.version == 6 and address.ipv4_mapped is not None:
+        return address.ipv4_mapped
+    return address
+
+
+def parse_forwarded(header: str) -> List[str]:
+    """
+    提取 RFC 7239 Forwarded 头中各跳的 for 参数
+
+    Args:
+        header: Forwarded 头，多个头以逗号合并
+
+    Returns:
+        for 参数值列表，从客户端到最近一跳排列；缺少 for 参数的跳记为空字符串
+    """
+    hops = []
+    for element in _split_quoted(header, ","):
+        value = ""
+        for pair in _split_quoted(element, ";"):
+            name, _, raw = pair.partition("=")
+            if name.strip().lower() == "for":
+                value = raw.strip().strip('"')
+                break
+        hops.append(value)
+    return hops
+
+
+def _split_quoted(text: str, separator: str) -> List[str]:
+    """按分隔符切分，忽略引号内的分隔符"""
+    parts = []
+    start = 0
+    quoted = False
+    for index, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif char == separator and not quoted:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return parts
+
+
+class ClientIPResolver:
+    """根据直连地址和代理头解析客户端真实IP"""
+
+    def __init__(self, trusted_proxies: TrustedProxies, header: str = TRUSTED_PROXY_HEADER,
+                 cache_size: int = CLIENT_IP_CACHE_SIZE):
+        """
+        Args:
+            trusted_proxies: 受信任代理集合
+            header: 受信任代理写入客户端地址的请求头（小写），不支持的头名抛出 ValueError
+            cache_size: 解析结果缓存的最大条目数
+        """
+        if header not in PROXY_HEADERS:
+            raise ValueError(f"不支持的代理头: {header}，可选 {', '.join(PROXY_HEADERS)}")
+        self.trusted_proxies = trusted_proxies
+        self.header = header
+        self.header_bytes = header.encode("latin-1")
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def _resolve(self, peer: Optional[str], header_value: Optional[str]) -> str:
+        """
+        解析客户端IP
+
+        Args:
+            peer: 直连对端地址
+            header_value: 配置的代理头的值，同名头出现多次时以逗号连接
+
+        Returns:
+            客户端IP地址，没有直连地址时为 "unknown"
+        """
+        if not peer:
+            return "unknown"
+        address = parse_address(peer)
+        if address is None or address not in self.trusted_proxies:
+            return peer
+        if not header_value:
+            return str(address)
+
+        if self.header == "forwarded":
+            hops = parse_forwarded(header_value)
+        else:
+            hops = header_value.split(",")
+
+        # 从最近一跳向客户端方向查找第一个不受信任的地址；无法解析的地址无法继续追溯，
+        # 以报告它的受信任代理为准
+        for hop in reversed(hops):
+            hop_address = parse_address(hop)
+            if hop_address is None:
+                break
+            address = hop_address
+            if address not in self.trusted_proxies:
+                break
+        return str(address)
+
+
+class ClientIPMiddleware:
+    """在请求进入路由前解析一次客户端IP，保存到 request.state.client_ip"""
+
+    def __init__(self, app, resolver: ClientIPResolver):
+        self.app = app
+        self.resolver = resolver
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            with phase("client_ip"):
+                header_name = self.resolver.header_bytes
+                header_value = None
+                for name, value in scope["headers"]:
+                    if name == header_name:
+                        header_value = value if header_value is None else header_value + b"," + value
+                client = scope.get("client")
+                scope.setdefault("state", {})["client_ip"] = self.resolver.resolve(
+                    client[0] if client else None,
+                    header_value.decode("latin-1") if header_value is not None else None
+                )
+        await self.app(scope, receive, send)
+
+
+# 全局实例
+client_ip_resolver = ClientIPResolver(TrustedProxies(TRUSTED_PROXIES.split(",")))
@@ -0,0 +1,165 @@
+"""
+日期信息构建
+
+/time 与 /time/{date} 共用的日期信息流水线：节假日、农历、节气、季节等只随日期变化的字段
+按日期计算一次并缓存，时分秒字段按纪元秒缓存，每次请求只计算时间戳和微秒。
+"""
+
+import time
+from datetime import datetime, date
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple, NamedTuple
+
+from holiday_loader import holiday_loader
+from lunar_calendar import get_lunar_info
+from solar_terms import get_solar_term_info
+from timing import phase
+
+# 按日期缓存的最大条目数，/time/{date} 可以查询任意日期，需要限制缓存大小
+DATE_CACHE_SIZE = 4096
+
+
+class DateParts(NamedTuple):
+    """一个日期的全部日期级字段（只读的共享字典）"""
+    head: Dict[str, Any]   # /time 中位于时分秒之前的字段
+    tail: Dict[str, Any]   # /time 中位于微秒之后的字段
+    query: Dict[str, Any]  # /time/{date} 中位于查询参数之后的字段
+
+
+def get_season(month: int) -> str:
+    """获取季节"""
+    if month in [3, 4, 5]:
+        return "春季"
+    elif month in [6, 7, 8]:
+        return "夏季"
+    elif month in [9, 10, 11]:
+        return "秋季"
+    else:
+        return "冬季"
+
+
+def get_lunar_date(solar_date: date) -> Dict[str, Any]:
+    """获取农历日期信息（干支纪年、生肖、农历月日、闰月及节日）"""
+    return get_lunar_info(solar_date)
+
+
+def get_lunar_festival(solar_date: date) -> str:
+    """获取节日：优先农历节日（含除夕），其次公历固定节日"""
+    return get_lunar_info(solar_date)["festival"]
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def get_date_parts(check_date: date) -> DateParts:
+    """
+    计算指定日期的日期级字段，按日期缓存
+
+    Args:
+        check_date: 日期
+
+    Returns:
+        日期级字段，其中的字典为共享对象，请勿修改
+    """
+    with phase("loader"):
+        holiday_info = holiday_loader.get_holiday_info(check_date)
+    with phase("lunar"):
+        lunar_date = get_lunar_date(check_date)
+        solar_term = get_solar_term_info(check_date)
+
+    head = {
+        "date": holiday_info["date"],
+        "weekday": holiday_info["weekday"],
+        "year": check_date.year,
+        "month": check_date.month,
+        "day": check_date.day
+    }
+    tail = {
+        "is_holiday": holiday_info["is_holiday"],
+        "is_workday": holiday_info["is_workday"],
+        "holiday_name": holiday_info["holiday_name"],
+        "holiday_type": holiday_info["holiday_type"],
+        "holiday_source": holiday_info["source"],
+        "lunar_date": lunar_date,
+        "solar_term": solar_term,
+        "season": get_season(check_date.month),
+        "quarter": (check_date.month - 1) // 3 + 1,
+        "day_of_year": holiday_info["day_of_year"],
+        "week_of_year": holiday_info["week_of_year"]
+    }
+    query = {"date": head["date"], "weekday": head["weekday"]}
+    query.update(tail)
+    return DateParts(head, tail, query)
+
+
+def clear_cache():
+    """清空日期信息缓存，节假日数据更新后调用"""
+    global _second_cache
+    get_date_parts.cache_clear()
+    _second_cache = (None, {})
+
+
+# 时分秒字段缓存：(纪元秒, 只读字典)，整体替换保证并发读取时键值一致
+_second_cache: Tuple[Optional[int], Dict[str, Any]] = (None, {})
+
+# 节假日数据热更新后清空按日期缓存的字段
+holiday_loader.add_reload_listener(clear_cache)
+
+
+def _get_second_parts(now: datetime, epoch_second: int) -> Dict[str, Any]:
+    """获取只随秒变化的时间信息字段（微秒之前的部分），按纪元秒缓存"""
+    global _second_cache
+    cached_second, parts = _second_cache
+    if cached_second == epoch_second:
+        return parts
+
+    head = get_date_parts(now.date()).head
+    parts = {
+        "date": head["date"],
+        "time": now.strftime("%H:%M:%S"),
+        "timezone": "Asia/Shanghai",
+        "weekday": head["weekday"],
+        "year": head["year"],
+        "month": head["month"],
+        "day": head["day"],
+        "hour": now.hour,
+        "minute": now.minute,
+        "second": now.second
+    }
+    _second_cache = (epoch_second, parts)
+    return parts
+
+
+def get_time_info() -> Dict[str, Any]:
+    """
+    获取当前时间的详细信息
+
+    返回的字典是新建的，但其中嵌套的字典为共享对象，请勿修改。
+    """
+    timestamp = time.time()
+    now = datetime.fromtimestamp(timestamp)
+
+    second_parts = _get_second_parts(now, int(timestamp))
+
+    info = {"timestamp": now.isoformat()}
+    info.update(second_parts)
+    info["microsecond"] = now.microsecond
+    info.update(get_date_parts(now.date()).tail)
+    return info
+
+
+def get_time_info_by_date(check_date: date, query_date: str) -> Dict[str, Any]:
+    """
+    获取指定日期的时间信息和节假日判断
+
+    Args:
+        check_date: 要查询的日期
+        query_date: 原始查询字符串，原样返回
+
+    Returns:
+        时间信息字典，其中嵌套的字典为共享对象，请勿修改
+    """
+    info = {
+        "query_date": query_date,
+        "current_time": datetime.now().isoformat()
+    }
+    info.update(get_date_parts(check_date).query)
+    return info
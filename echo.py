@@ -0,0 +1,210 @@
+"""
+请求体回显
+
+按块读取请求体，边读边统计长度和 SHA-256，超过上限时返回 413，内存占用只与预览大小（JSON 为请求体大小）有关。
+JSON 请求体只解析一次；文本返回截断的预览；二进制返回 base64 预览；multipart 只统计每个部分的字段名、
+文件名、类型和大小，不缓存内容也不写临时文件。
+"""
+
+import base64
+import codecs
+import hashlib
+import json
+import os
+from typing import Dict, Any, List, AsyncIterator, Iterable, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from multipart.multipart import MultipartParser, parse_options_header
+
+# 请求体的最大字节数
+ECHO_MAX_BYTES = int(os.getenv("ECHO_MAX_BYTES", str(10 * 1024 * 1024)))
+# 文本和二进制请求体回显的预览字节数
+ECHO_PREVIEW_BYTES = int(os.getenv("ECHO_PREVIEW_BYTES", "65536"))
+
+# 摘要模式下只回显名称、不回显值的敏感请求头（小写）
+SENSITIVE_HEADERS = frozenset({
+    "authorization", "proxy-authorization", "cookie", "x-admin-token", "x-api-key", "x-auth-token"
+})
+_REDACTED = "[REDACTED]"
+
+_TEXT_TYPES = ("application/x-www-form-urlencoded", "application/xml", "application/javascript")
+
+
+def check_content_length(request: Request, max_bytes: int = ECHO_MAX_BYTES):
+    """请求头声明的长度已经超过上限时，不读取请求体直接返回 413"""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"请求体不能超过 {max_bytes} 字节")
+
+
+def redact_headers(headers: Iterable[Tuple[str, str]]) -> Dict[str, str]:
+    """
+    整理要回显的请求头，敏感请求头的值替换为 [REDACTED]
+
+    Args:
+        headers: (小写名称, 值) 序列
+
+    Returns:
+        名称 -> 值，同名头以第一个为准（与 dict(request.headers) 相同）
+    """
+    result: Dict[str, str] = {}
+    for name, value in headers:
+        if name not in result:
+            result[name] = _REDACTED if name in SENSITIVE_HEADERS else value
+    return result
+
+
+class _MultipartSummary:
+    """流式统计 multipart 各部分的元数据"""
+
+    def __init__(self, boundary: bytes):
+        self.parts: List[Dict[str, Any]] = []
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: Dict[bytes, bytes] = {}
+        self._size = 0
+        self.parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._size = 0
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        self._size += end - start
+
+    def _on_part_end(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name")
+        filename = options.get(b"filename")
+        content_type = self._headers.get(b"content-type")
+        self.parts.append({
+            "name": name.decode("utf-8", "replace") if name is not None else None,
+            "filename": filename.decode("utf-8", "replace") if filename is not None else None,
+            "content_type": content_type.decode("latin-1") if content_type is not None else None,
+            "size": self._size
+        })
+
+
+async def read_echo_body(request: Request, max_bytes: int = ECHO_MAX_BYTES,
+                         preview_bytes: int = ECHO_PREVIEW_BYTES) -> Dict[str, Any]:
+    """
+    按块读取请求体并生成回显摘要
+
+    Args:
+        request: 请求对象
+        max_bytes: 请求体的最大字节数
+        preview_bytes: 文本和二进制请求体的预览字节数
+
+    Returns:
+        {"content_length", "sha256", "data"}，data 的内容取决于请求体类型
+
+    Raises:
+        HTTPException: 请求体超过上限（413）、JSON 或 multipart 格式错误（400）
+    """
+    check_content_length(request, max_bytes)
+
+    content_type = request.headers.get("content-type", "")
+    media_type, options = parse_options_header(content_type)
+    media_type = media_type.decode("latin-1").lower()
+    is_json = media_type == "application/json" or media_type.endswith("+json")
+
+    multipart = None
+    if media_type.startswith("multipart/"):
+        boundary = options.get(b"boundary")
+        if not boundary:
+            raise HTTPException(status_code=400, detail="multipart 请求缺少 boundary")
+        multipart = _MultipartSummary(boundary)
+
+    digest = hashlib.sha256()
+    length = 0
+    # JSON 需要完整请求体才能解析，其他类型只保留预览
+    buffer = bytearray()
+    limit = max_bytes if is_json else preview_bytes
+    try:
+        async for chunk in request.stream():
+            length += len(chunk)
+            if length > max_bytes:
+                raise HTTPException(status_code=413, detail=f"请求体不能超过 {max_bytes} 字节")
+            digest.update(chunk)
+            if len(buffer) < limit:
+                buffer += chunk[:limit - len(buffer)]
+            if multipart is not None:
+                multipart.parser.write(chunk)
+        if multipart is not None:
+            multipart.parser.finalize()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"无法解析请求数据: {str(e)}")
+
+    if is_json:
+        try:
+            data = {"json_data": json.loads(bytes(buffer)) if buffer else None}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"无法解析请求数据: {str(e)}")
+    elif multipart is not None:
+        data = {"multipart": multipart.parts}
+    else:
+        data = _preview(bytes(buffer), media_type, truncated=length > len(buffer))
+
+    return {
+        "content_length": length,
+        "sha256": digest.hexdigest(),
+        "data": data
+    }
+
+
+def _preview(body: bytes, media_type: str, truncated: bool) -> Dict[str, Any]:
+    """文本请求体按 UTF-8 返回预览，无法解码的二进制请求体返回 base64 预览"""
+    if media_type.startswith("text/") or media_type in _TEXT_TYPES or not media_type:
+        try:
+            # 截断位置可能落在多字节字符中间，截断时丢弃末尾不完整的字符
+            text = codecs.getincrementaldecoder("utf-8")().decode(body, final=not truncated)
+            return {"raw_data": text, "truncated": truncated}
+        except UnicodeDecodeError:
+            pass
+    return {"raw_data_base64": base64.b64encode(body).decode("ascii"), "truncated": truncated}
+
+
+async def stream_echo_body(request: Request, max_bytes: int = ECHO_MAX_BYTES) -> AsyncIterator[bytes]:
+    """原样流式返回请求体，超过上限时中断响应"""
+    length = 0
+    async for chunk in request.stream():
+        length += len(chunk)
+        if length > max_bytes:
+            raise HTTPException(status_code=413, detail=f"请求体不能超过 {max_bytes} 字节")
+        if chunk:
+            yield chunk
+
+
+class EchoStreamResponse(StreamingResponse):
+    """
+    边读请求体边发送的流式响应
+
+    StreamingResponse 会同时调用 receive() 监听客户端断开，这会抢走尚未读取的请求体分块，
+    这里只发送响应，客户端断开由读取请求体时的 ClientDisconnect 结束。
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
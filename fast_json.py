@@ -0,0 +1,53 @@
+"""
+快速JSON编码
+
+安装了 orjson 时使用 orjson 编码，否则退回标准库 json，两者输出相同的紧凑格式并保留中文字符。
+FastJSONResponse 直接编码传入的内容，不经过 FastAPI 的 jsonable_encoder，
+只用于内容全部由 dict/list/str/int/float/bool/None 组成的已知安全数据。
+"""
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from timing import phase
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，未安装时使用标准库
+    orjson = None
+
+JSON_ENGINE = "orjson" if orjson is not None else "json"
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    """使用标准库编码"""
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+if orjson is not None:
+    def dumps(obj: Any) -> bytes:
+        """以紧凑格式编码JSON，返回UTF-8字节串"""
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # orjson 不支持的值（如超过64位的整数）交给标准库处理
+            return _stdlib_dumps(obj)
+else:
+    dumps = _stdlib_dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """跳过 jsonable_encoder、使用快速编码器的JSON响应"""
+
+    def render(self, content: Any) -> bytes:
+        with phase("json"):
+            return dumps(content)
+
+
+class RawJSONResponse(JSONResponse):
+    """直接发送已编码JSON字节串的响应，用于预先序列化的静态数据"""
+
+    def render(self, content: bytes) -> bytes:
+        return content
@@ -0,0 +1,309 @@
+"""
+节假日日历位图
+
+将所有年份的节假日数据预先编译为紧凑的日历结构：每天一个字节的类型码，
+外加一张节日名称表。单日、区间和批量查询都只做数组下标运算，不再访问字典。
+"""
+
+from array import array
+from datetime import date
+from itertools import accumulate
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+
+# 日期类型码：bit0 表示放假，bit1 表示来自官方安排
+DAY_WORKDAY = 0           # 普通工作日
+DAY_WEEKEND = 1           # 普通周末
+DAY_ADJUSTED_WORKDAY = 2  # 调休上班
+DAY_HOLIDAY = 3           # 法定节假日
+
+OFF_DAY_MASK = 1
+OFFICIAL_MASK = 2
+
+# 按星期几（0=周一）排列的普通类型码
+_WEEK_CODES = bytes([DAY_WORKDAY] * 5 + [DAY_WEEKEND] * 2)
+
+# 用于 bytes.translate 的映射表：类型码 -> 是否放假 / 是否上班
+_OFF_DAY_TABLE = bytes((code & OFF_DAY_MASK) for code in range(256))
+_WORKDAY_TABLE = bytes(1 - (code & OFF_DAY_MASK) for code in range(256))
+
+_MAX_ORDINAL = date.max.toordinal()
+
+_result_cache: Dict[Tuple[int, Optional[str]], Dict[str, Any]] = {}
+
+
+def day_result(code: int, holiday_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    获取类型码对应的节假日查询结果
+
+    相同的(类型码, 节日名称)只创建一次，返回的字典为只读共享对象，请勿修改。
+
+    Args:
+        code: 日期类型码
+        holiday_name: 官方安排的节日名称，普通日期忽略
+
+    Returns:
+        与 HolidayLoader.is_holiday 相同结构的字典
+    """
+    if not code & OFFICIAL_MASK:
+        holiday_name = "周末" if code == DAY_WEEKEND else None
+    key = (code, holiday_name)
+    result = _result_cache.get(key)
+    if result is None:
+        is_off_day = code == DAY_WEEKEND or code == DAY_HOLIDAY
+        if code & OFFICIAL_MASK:
+            day_type = "holiday" if is_off_day else "workday"
+        else:
+            day_type = "weekend" if is_off_day else "workday"
+        result = {
+            "is_holiday": is_off_day,
+            "is_workday": not is_off_day,
+            "holiday_name": holiday_name,
+            "type": day_type,
+            "source": "official" if code & OFFICIAL_MASK else "weekend"
+        }
+        _result_cache[key] = result
+    return result
+
+
+def week_codes(start_ordinal: int, length: int) -> bytes:
+    """生成从指定日期序数开始、只按周末规则判断的类型码序列"""
+    if length <= 0:
+        return b""
+    # 序数1（公元1年1月1日）是周一
+    shift = (start_ordinal - 1) % 7
+    week = _WEEK_CODES[shift:] + _WEEK_CODES[:shift]
+    return (week * (length // 7 + 1))[:length]
+
+
+def _week_workdays_before(ordinal: int) -> int:
+    """按周末规则统计序数 [1, ordinal) 内的工作日数量"""
+    days = ordinal - 1
+    return days // 7 * 5 + min(days % 7, 5)
+
+
+class HolidayCalendar:
+    """覆盖连续多个年份的节假日日历"""
+
+    def __init__(self, first_year: int, last_year: int, codes: array, name_ids: array, names: List[Optional[str]]):
+        """
+        初始化日历
+
+        Args:
+            first_year: 覆盖的第一个年份
+            last_year: 覆盖的最后一个年份
+            codes: 每天一个字节的类型码
+            name_ids: 每天一个字节的节日名称编号，0 表示没有名称
+            names: 节日名称表，names[0] 固定为 None
+        """
+        self.first_year = first_year
+        self.last_year = last_year
+        self.start_ordinal = date(first_year, 1, 1).toordinal()
+        self.end_ordinal = date(last_year + 1, 1, 1).toordinal()  # 不含
+        self.codes = codes
+        self.name_ids = name_ids
+        self.names = names
+        # 按 类型码 * 名称数 + 名称编号 预先生成所有查询结果
+        self._results = [day_result(code, name) for code in range(4) for name in names]
+        # 工作日前缀和：workday_prefix[i] 为覆盖范围内前 i 天的工作日数量
+        self.workday_prefix = array("I", accumulate(codes.tobytes().translate(_WORKDAY_TABLE), initial=0))
+        self._workdays_before_start = _week_workdays_before(self.start_ordinal)
+
+    @classmethod
+    def build(cls, first_year: int, last_year: int, official_days: Iterable[Tuple[int, bool, str]]) -> "HolidayCalendar":
+        """
+        从官方节假日安排构建日历
+
+        Args:
+            first_year: 覆盖的第一个年份
+            last_year: 覆盖的最后一个年份
+            official_days: (日期序数, 是否放假, 节日名称) 序列，超出覆盖范围的条目被忽略
+
+        Returns:
+            日历对象
+        """
+        start_ordinal = date(first_year, 1, 1).toordinal()
+        length = date(last_year + 1, 1, 1).toordinal() - start_ordinal
+        codes = array("B", week_codes(start_ordinal, length))
+        name_ids = array("B", bytes(length))
+        names: List[Optional[str]] = [None]
+        name_lookup: Dict[str, int] = {}
+
+        for ordinal, is_off_day, name in official_days:
+            offset = ordinal - start_ordinal
+            if not 0 <= offset < length:
+                continue
+            name_id = name_lookup.get(name)
+            if name_id is None:
+                name_id = len(names)
+                if name_id > 255:
+                    raise ValueError("节日名称过多，无法编码")
+                names.append(name)
+                name_lookup[name] = name_id
+            codes[offset] = DAY_HOLIDAY if is_off_day else DAY_ADJUSTED_WORKDAY
+            name_ids[offset] = name_id
+
+        return cls(first_year, last_year, codes, name_ids, names)
+
+    def covers(self, check_date: date) -> bool:
+        """判断日期是否在日历覆盖范围内"""
+        return self.start_ordinal <= check_date.toordinal() < self.end_ordinal
+
+    def day_code(self, check_date: date) -> int:
+        """获取单个日期的类型码"""
+        ordinal = check_date.toordinal()
+        if self.start_ordinal <= ordinal < self.end_ordinal:
+            return self.codes[ordinal - self.start_ordinal]
+        return DAY_WEEKEND if check_date.weekday() >= 5 else DAY_WORKDAY
+
+    def lookup(self, check_date: date) -> Dict[str, Any]:
+        """
+        查询单个日期
+
+        Args:
+            check_date: 要检查的日期
+
+        Returns:
+            与 HolidayLoader.is_holiday 相同结构的共享字典
+        """
+        offset = check_date.toordinal() - self.start_ordinal
+        if 0 <= offset < len(self.codes):
+            return self._results[self.codes[offset] * len(self.names) + self.name_ids[offset]]
+        return self._results[(DAY_WEEKEND if check_date.weekday() >= 5 else DAY_WORKDAY) * len(self.names)]
+
+    def range_codes(self, start: date, end: date) -> bytes:
+        """
+        获取日期区间（含首尾）内每天的类型码
+
+        覆盖范围以外的日期按周末规则补齐。
+        """
+        first = start.toordinal()
+        last = end.toordinal() + 1
+        if last <= first:
+            return b""
+        inner_first = min(max(first, self.start_ordinal), self.end_ordinal)
+        inner_last = max(min(last, self.end_ordinal), inner_first)
+        return (
+            week_codes(first, inner_first - first)
+            + self.codes[inner_first - self.start_ordinal:inner_last - self.start_ordinal].tobytes()
+            + week_codes(inner_last, last - inner_last)
+        )
+
+    def range_lookup(self, start: date, end: date) -> List[Dict[str, Any]]:
+        """获取日期区间（含首尾）内每天的查询结果"""
+        return self.bulk_lookup_ordinals(range(start.toordinal(), end.toordinal() + 1))
+
+    def bulk_lookup(self, dates: Iterable[date]) -> List[Dict[str, Any]]:
+        """批量查询任意日期"""
+        return self.bulk_lookup_ordinals([d.toordinal() for d in dates])
+
+    def bulk_lookup_ordinals(self, ordinals: Iterable[int]) -> List[Dict[str, Any]]:
+        """按日期序数批量查询"""
+        codes = self.codes
+        name_ids = self.name_ids
+        results = self._results
+        stride = len(self.names)
+        start = self.start_ordinal
+        length = len(codes)
+        out = []
+        for ordinal in ordinals:
+            offset = ordinal - start
+            if 0 <= offset < length:
+                out.append(results[codes[offset] * stride + name_ids[offset]])
+            else:
+                out.append(results[_WEEK_CODES[(ordinal - 1) % 7] * stride])
+        return out
+
+    def count_days(self, start: date, end: date) -> Dict[str, int]:
+        """
+        统计日期区间（含首尾）内的放假天数与工作天数
+
+        Returns:
+            包含 total_days、off_days、work_days 的字典
+        """
+        codes = self.range_codes(start, end)
+        off_days = codes.translate(_OFF_DAY_TABLE).count(1)
+        return {
+            "total_days": len(codes),
+            "off_days": off_days,
+            "work_days": len(codes) - off_days
+        }
+
+    def _workdays_before(self, ordinal: int) -> int:
+        """统计序数 [1, ordinal) 内的工作日数量，覆盖范围内使用前缀和，范围外按周末规则"""
+        if ordinal <= self.start_ordinal:
+            return _week_workdays_before(ordinal)
+        if ordinal <= self.end_ordinal:
+            return self._workdays_before_start + self.workday_prefix[ordinal - self.start_ordinal]
+        return (
+            self._workdays_before_start + self.workday_prefix[-1]
+            + _week_workdays_before(ordinal) - _week_workdays_before(self.end_ordinal)
+        )
+
+    def count_workdays(self, start: date, end: date) -> int:
+        """
+        统计日期区间（含首尾）内的工作日数量，包括调休上班日
+
+        Args:
+            start: 开始日期
+            end: 结束日期
+
+        Returns:
+            工作日数量，结束日期早于开始日期时为0
+        """
+        if end < start:
+            return 0
+        return self._workdays_before(end.toordinal() + 1) - self._workdays_before(start.toordinal())
+
+    def add_workdays(self, start: date, days: int) -> date:
+        """
+        计算从指定日期起第N个工作日
+
+        Args:
+            start: 起始日期（不计入）
+            days: 工作日数量，负数表示向前推算，0 返回起始日期本身
+
+        Returns:
+            目标日期
+
+        Raises:
+            ValueError: 结果超出可表示的日期范围
+        """
+        ordinal = start.toordinal()
+        if days == 0:
+            return start
+
+        if days > 0:
+            # 找到最小的 x，使 [ordinal + 1, x] 内恰有 days 个工作日
+            target = self._workdays_before(ordinal + 1) + days
+            lo, step = ordinal + 1, days
+            # 倍增上界直到区间内工作日足够，上界不超过 date.max，到达后再检查一次是否足够
+            hi = min(ordinal + step, _MAX_ORDINAL)
+            while hi < _MAX_ORDINAL and self._workdays_before(hi + 1) < target:
+                step *= 2
+                hi = min(ordinal + step, _MAX_ORDINAL)
+            if self._workdays_before(hi + 1) < target:
+                raise ValueError("日期超出范围")
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._workdays_before(mid + 1) >= target:
+                    hi = mid
+                else:
+                    lo = mid + 1
+        else:
+            # 找到最大的 x，使 [x, ordinal - 1] 内恰有 -days 个工作日
+            target = self._workdays_before(ordinal) + days
+            hi, step = ordinal - 1, -days
+            lo = max(ordinal - step, 1)
+            while lo > 1 and self._workdays_before(lo) > target:
+                step *= 2
+                lo = max(ordinal - step, 1)
+            if self._workdays_before(lo) > target:
+                raise ValueError("日期超出范围")
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if self._workdays_before(mid) <= target:
+                    lo = mid
+                else:
+                    hi = mid - 1
+
+        return date.fromordinal(lo)
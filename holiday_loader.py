@@ -1,52 +1,271 @@
+import asyncio
+import hashlib
 import json
 import os
-from datetime import date
-from typing import Dict, Any, Optional, List
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Dict, Any, Optional, List, Tuple, Iterator, Iterable, Callable, Hashable, NamedTuple
 from pathlib import Path
 
+from holiday_calendar import (
+    HolidayCalendar, day_result, DAY_WORKDAY, DAY_WEEKEND, DAY_ADJUSTED_WORKDAY, DAY_HOLIDAY
+)
+from holiday_snapshot import HolidaySnapshot, open_snapshot, parse_days
+
+# 节假日二进制快照路径（由 holiday_snapshot.py 生成），文件不存在或过期时读取 JSON
+HOLIDAY_SNAPSHOT = os.getenv("HOLIDAY_SNAPSHOT", "holiday.snapshot")
+
+# 非法定节假日日期的查询结果（只读，全局共享）
+_WEEKEND_RESULT = day_result(DAY_WEEKEND)
+_WORKDAY_RESULT = day_result(DAY_WORKDAY)
+
+# 按星期几（0=周一）预先建好的星期信息（只读，全局共享）
+_WEEKDAY_NAMES = ("周一", "周二", "周三", "周四", "周五", "周六", "周日")
+_WEEKDAY_ENGLISH = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+_WEEKDAY_INFO = tuple(
+    {"number": number, "name": name, "english": english}
+    for number, (name, english) in enumerate(zip(_WEEKDAY_NAMES, _WEEKDAY_ENGLISH))
+)
+
+class DayEntry(NamedTuple):
+    """数据文件中的一个日期条目，节日名称经过驻留，相同名称共享同一个字符串"""
+    ordinal: int      # 日期序数
+    is_off_day: bool  # 是否放假
+    name: str         # 节日名称
+
+class YearData(NamedTuple):
+    """一个年份的已加载数据，整体替换以保证读取方看到的数据、索引和摘要始终一致"""
+    days: Tuple[DayEntry, ...]                # 数据文件中的日期条目，保持源文件顺序
+    start_ordinal: int                        # 当年1月1日的序数
+    slots: List[Optional[Dict[str, Any]]]     # 366个槽位的查询结果，无特殊安排的日期为None
+    digest: Optional[str]                     # 数据文件内容的 SHA-256，没有数据文件时为 None
+    signature: Optional[Tuple[int, int]]      # 加载时文件的 (修改时间ns, 大小)，用于检测变化
+    loaded_at: float                          # 加载完成的时间戳
+    load_seconds: float                       # 读取、解析和建立索引的耗时
+    source: str = "json"                      # 数据来源：json、snapshot 或 missing（没有数据文件）
+
+# 没有数据文件的年份共用的空数据（只读，不放入缓存）：没有日期条目时不查槽位，只按周末判断
+_MISSING_YEAR = YearData((), 0, [], None, None, 0.0, 0.0, "missing")
+
+# 文件加载锁的数量，年份按取模分配，锁的数量不随查询过的年份增长
+_LOAD_LOCK_STRIPES = 64
+
+def _make_days(days: Iterable[Tuple[int, bool, str]]) -> Tuple[DayEntry, ...]:
+    """把 (日期序数, 是否放假, 名称) 条目转换为紧凑的日期记录，驻留节日名称"""
+    return tuple(
+        DayEntry(ordinal, is_off_day, sys.intern(name) if isinstance(name, str) else name)
+        for ordinal, is_off_day, name in days
+    )
+
 class HolidayLoader:
     """节假日数据加载器"""
     
-    def __init__(self, holiday_dir: str = "holiday"):
+    def __init__(self, holiday_dir: str = "holiday", snapshot_path: Optional[str] = None):
         """
         初始化节假日加载器
         
         Args:
             holiday_dir: 节假日数据文件目录
+            snapshot_path: 二进制快照文件路径，为 None 时只读取 JSON
         """
         self.holiday_dir = Path(holiday_dir)
-        self._holiday_cache = {}  # 缓存已加载的节假日数据
+        self.snapshot_path = snapshot_path
+        self._snapshot: Optional[HolidaySnapshot] = None  # 映射的二进制快照
+        self._snapshot_checked = False  # 是否已尝试打开快照
+        self._years: Dict[int, YearData] = {}  # 年份 -> 已加载的数据与索引
+        self._calendar: Optional[HolidayCalendar] = None  # 覆盖所有年份的日历位图
+        self._available_years: Optional[List[int]] = None  # 数据目录中的年份列表
+        self.warmup_seconds: Optional[float] = None  # 最近一次预加载的耗时，未预加载时为 None
+        self._lock = threading.Lock()  # 保护加载统计和快照的打开
+        self._calendar_lock = threading.Lock()  # 保证日历位图只构建一次
+        self._reload_lock = threading.Lock()  # 串行化热更新
+        self._reload_listeners: List[Callable[[], None]] = []  # 数据热更新后的回调
+        self._rejected: Dict[int, Optional[Tuple[int, int]]] = {}  # 年份 -> 解析失败的文件签名，文件再次变化前不重试
+        # 按年份取模分配的文件加载锁，保证同一年份只读一次文件，且读取与热更新的替换互斥
+        self._load_locks = [threading.Lock() for _ in range(_LOAD_LOCK_STRIPES)]
+        self._inflight: Dict[Hashable, "asyncio.Future"] = {}  # 事件循环中正在进行的后台加载
+        # 运行统计：异步入口的缓存命中/未命中（只在事件循环线程中更新）、文件加载次数和耗时
+        self.stats: Dict[str, float] = {
+            "year_hits": 0, "year_misses": 0, "calendar_hits": 0, "calendar_misses": 0,
+            "loads_json": 0, "loads_snapshot": 0, "loads_missing": 0, "load_errors": 0, "load_seconds": 0.0
+        }
         
     def load_holiday_data(self, year: int) -> Dict[str, Any]:
         """
         加载指定年份的节假日数据
         
+        内部只保存紧凑的日期条目，字典在调用时按需生成。
+        
         Args:
             year: 年份
             
         Returns:
-            节假日数据字典
+            节假日数据字典，days 中每项包含 name、date、isOffDay
+        """
+        return {
+            "year": year,
+            "days": [
+                {"name": day.name, "date": date.fromordinal(day.ordinal).isoformat(), "isOffDay": day.is_off_day}
+                for day in self._get_year(year).days
+            ]
+        }
+    
+    def _load_lock(self, year: int) -> threading.Lock:
+        """年份对应的文件加载锁"""
+        return self._load_locks[year % _LOAD_LOCK_STRIPES]
+    
+    def _get_year(self, year: int) -> YearData:
+        """
+        获取指定年份的已加载数据，必要时读取文件
+        
+        数据目录中没有文件的年份返回共享的空数据，不放入缓存，任意年份的查询不会使缓存无限增长。
         """
-        # 检查缓存
-        if year in self._holiday_cache:
-            return self._holiday_cache[year]
+        record = self._years.get(year)
+        if record is not None:
+            return record
+        if year not in self.get_available_years():
+            return _MISSING_YEAR
         
+        # 同一年份的并发加载只有一个线程真正读取文件，其余等待后直接读缓存
+        with self._load_lock(year):
+            record = self._years.get(year)
+            if record is None:
+                record = self._read_year(year)
+                self._record_load(record)
+                if record is None:
+                    # 读取失败时按没有数据处理，文件变化后由 refresh 重新加载
+                    record = self._empty_year(year, self._file_signature(year))
+                elif record is _MISSING_YEAR:
+                    # 扫描目录之后文件被删除
+                    return record
+                self._years[year] = record
+            return record
+    
+    def _record_load(self, record: Optional[YearData]):
+        """记录一次文件加载的统计信息"""
+        with self._lock:
+            if record is None:
+                self.stats["load_errors"] += 1
+            else:
+                self.stats[f"loads_{record.source}"] += 1
+                self.stats["load_seconds"] += record.load_seconds
+    
+    def _empty_year(self, year: int, signature: Optional[Tuple[int, int]]) -> YearData:
+        """数据文件存在但无法解析的年份只按周末判断，记录文件签名以便文件变化后重新加载"""
+        return YearData((), date(year, 1, 1).toordinal(), [None] * 366,
+                        None, signature, time.time(), 0.0, "missing")
+    
+    def _get_snapshot(self) -> Optional[HolidaySnapshot]:
+        """首次使用时打开并映射二进制快照"""
+        if not self._snapshot_checked:
+            with self._lock:
+                if not self._snapshot_checked:
+                    self._snapshot = open_snapshot(self.snapshot_path)
+                    self._snapshot_checked = True
+        return self._snapshot
+    
+    def _file_signature(self, year: int) -> Optional[Tuple[int, int]]:
+        """获取年份数据文件的 (修改时间ns, 大小)，文件不存在时为 None"""
+        try:
+            stat = os.stat(self.holiday_dir / f"{year}.json")
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _read_year(self, year: int) -> Optional[YearData]:
+        """
+        读取并解析年份数据文件，建立索引
+        
+        Returns:
+            新的年份数据；文件不存在时为共享的空数据 _MISSING_YEAR；读取或解析失败时为 None
+        """
         # 构建文件路径
         file_path = self.holiday_dir / f"{year}.json"
+        started = time.perf_counter()
         
-        if not file_path.exists():
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
             # 如果文件不存在，返回空数据
-            return {"year": year, "days": []}
+            return _MISSING_YEAR
+        
+        # 快照中记录的文件签名与当前一致时直接使用快照，不读取 JSON
+        snapshot = self._get_snapshot()
+        meta = snapshot.get_year(year) if snapshot is not None else None
+        raw = None
+        if meta is not None and (meta.mtime_ns, meta.size) != (stat.st_mtime_ns, stat.st_size):
+            if meta.size != stat.st_size:
+                meta = None
+            else:
+                # 修改时间变化（例如重新检出）但大小相同，比较内容摘要，仍然不必解析 JSON
+                try:
+                    raw, stat = self._read_file(file_path)
+                except FileNotFoundError:
+                    return _MISSING_YEAR
+                if hashlib.sha256(raw).hexdigest() != meta.digest:
+                    meta = None
+        
+        if meta is not None:
+            days = _make_days(snapshot.iter_days(year))
+            start_ordinal, slots = self._build_day_index(year, days)
+            return YearData(days, start_ordinal, slots, meta.digest, (stat.st_mtime_ns, stat.st_size),
+                            time.time(), time.perf_counter() - started, "snapshot")
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # 缓存数据
-                self._holiday_cache[year] = data
-                return data
+            if raw is None:
+                raw, stat = self._read_file(file_path)
+        except FileNotFoundError:
+            return _MISSING_YEAR
+        
+        try:
+            days = _make_days(parse_days(json.loads(raw.decode('utf-8'))))
+            start_ordinal, slots = self._build_day_index(year, days)
         except Exception as e:
             print(f"加载节假日数据失败 {year}: {e}")
-            return {"year": year, "days": []}
+            return None
+        
+        return YearData(days, start_ordinal, slots, hashlib.sha256(raw).hexdigest(),
+                        (stat.st_mtime_ns, stat.st_size), time.time(), time.perf_counter() - started)
+    
+    def _read_file(self, file_path: Path) -> Tuple[bytes, os.stat_result]:
+        """读取文件内容，同时返回打开时的文件状态"""
+        with open(file_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            return f.read(), stat
+    
+    def _build_day_index(self, year: int,
+                         days: Iterable[DayEntry]) -> Tuple[int, List[Optional[Dict[str, Any]]]]:
+        """
+        为一年的节假日数据建立按日期序数寻址的索引
+        
+        Args:
+            year: 年份
+            days: 该年份数据文件中的日期条目 [(日期序数, 是否放假, 名称)]
+            
+        Returns:
+            (当年1月1日的序数, 366个槽位的列表)，槽位中为共享的查询结果，无特殊安排的日期为None
+        """
+        start_ordinal = date(year, 1, 1).toordinal()
+        end_ordinal = date(year + 1, 1, 1).toordinal()
+        slots: List[Optional[Dict[str, Any]]] = [None] * 366
+        
+        for ordinal, is_off_day, name in days:
+            # 与逐条匹配的行为保持一致：只收录本年份的日期，重复日期以第一条为准
+            if not start_ordinal <= ordinal < end_ordinal:
+                continue
+            offset = ordinal - start_ordinal
+            if slots[offset] is None:
+                slots[offset] = day_result(DAY_HOLIDAY if is_off_day else DAY_ADJUSTED_WORKDAY, name)
+        
+        return start_ordinal, slots
+    
+    def _get_day_index(self, year: int) -> Tuple[int, List[Optional[Dict[str, Any]]]]:
+        """获取指定年份的日期索引，必要时加载数据"""
+        record = self._get_year(year)
+        return record.start_ordinal, record.slots
     
     def is_holiday(self, check_date: date) -> Dict[str, Any]:
         """
@@ -56,40 +275,18 @@ class HolidayLoader:
             check_date: 要检查的日期
             
         Returns:
-            包含节假日信息的字典
+            包含节假日信息的字典（只读的共享对象，请勿修改）
         """
-        year = check_date.year
-        date_str = check_date.strftime("%Y-%m-%d")
-        
-        # 加载节假日数据
-        holiday_data = self.load_holiday_data(year)
-        days = holiday_data.get("days", [])
-        
-        # 查找匹配的日期
-        for day_info in days:
-            if day_info.get("date") == date_str:
-                is_off_day = day_info.get("isOffDay", False)
-                holiday_name = day_info.get("name", "")
-                
-                return {
-                    "is_holiday": is_off_day,
-                    "is_workday": not is_off_day,
-                    "holiday_name": holiday_name,
-                    "type": "holiday" if is_off_day else "workday",
-                    "source": "official"
-                }
+        record = self._years.get(check_date.year) or self._get_year(check_date.year)
         
-        # 如果没有找到法定节假日，检查是否为周末
-        weekday = check_date.weekday()
-        is_weekend = weekday >= 5  # 5=周六, 6=周日
+        # 查找法定节假日/调休安排，没有日期条目的年份槽位全为空，不必查找
+        if record.days:
+            result = record.slots[check_date.toordinal() - record.start_ordinal]
+            if result is not None:
+                return result
         
-        return {
-            "is_holiday": is_weekend,
-            "is_workday": not is_weekend,
-            "holiday_name": "周末" if is_weekend else None,
-            "type": "weekend" if is_weekend else "workday",
-            "source": "weekend"
-        }
+        # 如果没有找到法定节假日，检查是否为周末（5=周六, 6=周日）
+        return _WEEKEND_RESULT if check_date.weekday() >= 5 else _WORKDAY_RESULT
     
     def get_holiday_info(self, check_date: date) -> Dict[str, Any]:
         """
@@ -101,27 +298,49 @@ class HolidayLoader:
         Returns:
             完整的节假日信息
         """
-        holiday_info = self.is_holiday(check_date)
-        
+        return self._build_holiday_info(check_date, self.is_holiday(check_date))
+    
+    def _build_holiday_info(self, check_date: date, holiday_info: Dict[str, Any]) -> Dict[str, Any]:
+        """根据日期和节假日查询结果组装完整的节假日信息（weekday 为只读的共享字典）"""
+        year = check_date.year
         return {
-            "date": check_date.strftime("%Y-%m-%d"),
-            "year": check_date.year,
+            # 与 strftime("%Y-%m-%d") 相同，isoformat 更快；1000年以前 strftime 的年份不补零，保持原输出
+            "date": check_date.isoformat() if year >= 1000 else check_date.strftime("%Y-%m-%d"),
+            "year": year,
             "month": check_date.month,
             "day": check_date.day,
-            "weekday": {
-                "number": check_date.weekday(),
-                "name": ["周一", "周二", "周三", "周四", "周五", "周六", "周日"][check_date.weekday()],
-                "english": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"][check_date.weekday()]
-            },
+            "weekday": _WEEKDAY_INFO[check_date.weekday()],
             "is_holiday": holiday_info["is_holiday"],
             "is_workday": holiday_info["is_workday"],
             "holiday_name": holiday_info["holiday_name"],
             "holiday_type": holiday_info["type"],
             "source": holiday_info["source"],
-            "day_of_year": check_date.timetuple().tm_yday,
+            "day_of_year": check_date.toordinal() - date(year, 1, 1).toordinal() + 1,
             "week_of_year": check_date.isocalendar()[1]
         }
     
+    def iter_holiday_info(self, start: date, end: date, chunk_days: int = 366) -> Iterator[Dict[str, Any]]:
+        """
+        逐日生成日期区间（含首尾）内的完整节假日信息
+        
+        按块从日历位图中批量查询，整个区间不会一次性展开到内存中。
+        
+        Args:
+            start: 开始日期
+            end: 结束日期
+            chunk_days: 每次批量查询的天数
+            
+        Yields:
+            与 get_holiday_info 相同结构的字典
+        """
+        calendar = self.get_calendar()
+        first = start.toordinal()
+        last = end.toordinal()
+        for chunk_start in range(first, last + 1, chunk_days):
+            ordinals = range(chunk_start, min(chunk_start + chunk_days, last + 1))
+            for ordinal, holiday_info in zip(ordinals, calendar.bulk_lookup_ordinals(ordinals)):
+                yield self._build_holiday_info(date.fromordinal(ordinal), holiday_info)
+    
     def get_year_holidays(self, year: int) -> List[Dict[str, Any]]:
         """
         获取指定年份的所有节假日信息
@@ -130,31 +349,33 @@ class HolidayLoader:
             year: 年份
             
         Returns:
-            节假日信息列表
+            节假日信息列表，按数据文件中的顺序排列
         """
-        holiday_data = self.load_holiday_data(year)
-        days = holiday_data.get("days", [])
-        
-        result = []
-        for day_info in days:
-            date_str = day_info.get("date")
-            if date_str:
-                try:
-                    check_date = date.fromisoformat(date_str)
-                    holiday_info = self.get_holiday_info(check_date)
-                    result.append(holiday_info)
-                except ValueError:
-                    continue
+        return [self.get_holiday_info(date.fromordinal(day.ordinal)) for day in self._get_year(year).days]
+    
+    def get_file_digest(self, year: int) -> Optional[str]:
+        """
+        获取指定年份数据文件内容的 SHA-256 摘要
         
-        return result
+        Args:
+            year: 年份
+            
+        Returns:
+            十六进制摘要，没有数据文件时为 None
+        """
+        return self._get_year(year).digest
     
     def get_available_years(self) -> List[int]:
         """
         获取可用的年份列表
         
         Returns:
-            可用年份列表
+            可用年份列表（只读的共享列表，请勿修改）
         """
+        years = self._available_years
+        if years is not None:
+            return years
+        
         years = []
         for file_path in self.holiday_dir.glob("*.json"):
             try:
@@ -163,11 +384,286 @@ class HolidayLoader:
             except ValueError:
                 continue
         
-        return sorted(years)
+        years.sort()
+        self._available_years = years
+        return years
+    
+    def preload(self, max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        并行加载并索引所有年份的数据，随后构建日历位图
+        
+        Args:
+            max_workers: 线程数，默认由线程池决定
+            
+        Returns:
+            预加载统计信息
+        """
+        started = time.perf_counter()
+        years = self.get_available_years()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="holiday-preload") as executor:
+            records = list(executor.map(self._get_year, years))
+        self.get_calendar()
+        self.warmup_seconds = time.perf_counter() - started
+        
+        return {
+            "years": len(years),
+            "loaded_years": sum(1 for record in records if record.digest),
+            "warmup_ms": round(self.warmup_seconds * 1000, 3)
+        }
+    
+    def is_warm(self) -> bool:
+        """判断是否已完成预加载，且所有年份的数据与日历位图都在缓存中"""
+        return (
+            self.warmup_seconds is not None
+            and self._calendar is not None
+            and all(year in self._years for year in self.get_available_years())
+        )
+    
+    def get_calendar(self) -> HolidayCalendar:
+        """
+        获取覆盖所有可用年份的日历位图，首次调用时构建
+        
+        Returns:
+            日历对象，覆盖范围以外的日期按周末规则判断
+        """
+        calendar = self._calendar
+        if calendar is None:
+            with self._calendar_lock:
+                calendar = self._calendar
+                if calendar is None:
+                    calendar = self._build_calendar()
+                    self._calendar = calendar
+        return calendar
+    
+    def _rebuild_calendar(self):
+        """热更新后重建日历位图，构建完成后整体替换；尚未构建过的不做处理"""
+        with self._calendar_lock:
+            if self._calendar is not None:
+                self._calendar = self._build_calendar()
+    
+    def _build_calendar(self) -> HolidayCalendar:
+        """从各年份的日期索引构建日历位图"""
+        years = self.get_available_years()
+        if not years:
+            current_year = date.today().year
+            return HolidayCalendar.build(current_year, current_year, [])
+        
+        official_days = []
+        for year in range(years[0], years[-1] + 1):
+            start_ordinal, slots = self._get_day_index(year)
+            for offset, result in enumerate(slots):
+                if result is not None:
+                    official_days.append((start_ordinal + offset, result["is_holiday"], result["holiday_name"]))
+        
+        return HolidayCalendar.build(years[0], years[-1], official_days)
+    
+    def count_workdays(self, start: date, end: date) -> int:
+        """
+        统计日期区间（含首尾）内的工作日数量（含调休上班日）
+        
+        Args:
+            start: 开始日期
+            end: 结束日期
+            
+        Returns:
+            工作日数量
+        """
+        return self.get_calendar().count_workdays(start, end)
+    
+    def add_workdays(self, start: date, days: int) -> date:
+        """
+        计算从指定日期起第N个工作日（含调休上班日）
+        
+        Args:
+            start: 起始日期（不计入）
+            days: 工作日数量，负数表示向前推算
+            
+        Returns:
+            目标日期
+        """
+        return self.get_calendar().add_workdays(start, days)
+    
+    async def _run_single_flight(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        在线程池中执行阻塞的加载函数，相同 key 的并发调用共享同一次执行
+        
+        Args:
+            key: 去重键
+            func: 无参数的阻塞函数
+            
+        Returns:
+            func 的返回值
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(None, func)
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield 保证某个请求被取消时不会连带取消其他请求共享的加载任务
+        return await asyncio.shield(future)
+    
+    async def load_year_async(self, year: int) -> None:
+        """
+        确保指定年份的数据已加载并建立索引，文件读取和解析在线程池中进行，不阻塞事件循环
+        
+        Args:
+            year: 年份
+        """
+        available = self._available_years
+        if year in self._years or (available is not None and year not in available):
+            # 已加载，或数据目录中没有该年份的文件，都不需要读取文件
+            self.stats["year_hits"] += 1
+        else:
+            self.stats["year_misses"] += 1
+            await self._run_single_flight(("year", year), lambda: self._get_year(year))
+    
+    async def get_calendar_async(self) -> HolidayCalendar:
+        """异步获取日历位图，首次构建在线程池中进行"""
+        calendar = self._calendar
+        if calendar is not None:
+            self.stats["calendar_hits"] += 1
+        else:
+            self.stats["calendar_misses"] += 1
+            calendar = await self._run_single_flight("calendar", self.get_calendar)
+        return calendar
+    
+    async def get_available_years_async(self) -> List[int]:
+        """异步获取可用的年份列表，首次扫描目录在线程池中进行"""
+        years = self._available_years
+        if years is None:
+            years = await self._run_single_flight("years", self.get_available_years)
+        return years
+    
+    def add_reload_listener(self, callback: Callable[[], None]):
+        """注册数据热更新后的回调，用于清理依赖节假日数据的下游缓存"""
+        self._reload_listeners.append(callback)
+    
+    def _notify_reload(self):
+        """通知所有热更新回调"""
+        for callback in self._reload_listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"节假日数据更新回调失败: {e}")
+    
+    def _scan_files(self) -> Dict[int, Tuple[int, int]]:
+        """扫描数据目录，返回 年份 -> (修改时间ns, 大小)"""
+        signatures = {}
+        try:
+            entries = list(os.scandir(self.holiday_dir))
+        except OSError:
+            return signatures
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            if ext != ".json":
+                continue
+            try:
+                year = int(stem)
+                stat = entry.stat()
+            except (ValueError, OSError):
+                continue
+            signatures[year] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+    
+    def reload_year(self, year: int) -> bool:
+        """
+        在后台重新加载单个年份，新索引构建完成后整体替换，读取方不会看到半成品
+        
+        Args:
+            year: 年份
+            
+        Returns:
+            数据内容是否发生变化；新文件解析失败时保留旧数据并返回 False
+        """
+        # 与 _get_year 使用同一把加载锁：读取旧文件的懒加载不会在热更新之后完成并覆盖新数据
+        with self._load_lock(year):
+            record = self._read_year(year)
+            self._record_load(record)
+            if record is None:
+                self._rejected[year] = self._file_signature(year)
+                return False
+            
+            self._rejected.pop(year, None)
+            if record is _MISSING_YEAR:
+                # 文件已删除，移出缓存，之后按没有数据处理
+                old = self._years.pop(year, None)
+                return old is not None and old.digest is not None
+            old = self._years.get(year)
+            self._years[year] = record
+            return old is None or old.digest != record.digest
+    
+    def refresh(self) -> List[int]:
+        """
+        检查数据目录的变化，只重新加载发生变化的年份，并在需要时重建日历位图
+        
+        Returns:
+            数据内容发生变化的年份列表
+        """
+        with self._reload_lock:
+            signatures = self._scan_files()
+            changed = []
+            for year, record in list(self._years.items()):
+                signature = signatures.get(year)
+                if signature == record.signature or self._rejected.get(year, False) == signature:
+                    continue
+                if self.reload_year(year):
+                    changed.append(year)
+            
+            years = sorted(signatures)
+            years_changed = self._available_years is not None and years != self._available_years
+            if years_changed:
+                self._available_years = years
+            
+            if changed or years_changed:
+                self._rebuild_calendar()
+                print(f"节假日数据已更新: 变化年份 {changed}, 可用年份 {len(years)} 个")
+                self._notify_reload()
+            return changed
+    
+    def get_loaded_years(self) -> List[int]:
+        """获取已加载（含文件无法解析）的年份列表，没有数据文件的年份不在其中"""
+        return sorted(self._years)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        获取已加载数据的状态
+        
+        Returns:
+            每个已加载年份的文件摘要、加载时间和耗时，以及日历位图的覆盖范围
+        """
+        calendar = self._calendar
+        return {
+            "holiday_dir": str(self.holiday_dir),
+            "snapshot": self._snapshot.path if self._snapshot is not None else None,
+            "warmup_ms": round(self.warmup_seconds * 1000, 3) if self.warmup_seconds is not None else None,
+            "available_years": self._available_years,
+            "calendar": {
+                "first_year": calendar.first_year,
+                "last_year": calendar.last_year,
+                "days": len(calendar.codes)
+            } if calendar is not None else None,
+            "years": [
+                {
+                    "year": year,
+                    "sha256": record.digest,
+                    "source": record.source,
+                    "days": len(record.days),
+                    "loaded_at": datetime.fromtimestamp(record.loaded_at).isoformat(),
+                    "load_ms": round(record.load_seconds * 1000, 3)
+                }
+                for year, record in sorted(self._years.items())
+            ]
+        }
     
     def reload_cache(self):
         """重新加载缓存"""
-        self._holiday_cache.clear()
+        self._years.clear()
+        self._calendar = None
+        self._available_years = None
+        # 重新打开快照，旧的映射在没有引用后释放
+        self._snapshot = None
+        self._snapshot_checked = False
+        self._notify_reload()
 
 # 全局实例
-holiday_loader = HolidayLoader() 
\ No newline at end of file
+holiday_loader = HolidayLoader(snapshot_path=HOLIDAY_SNAPSHOT) 
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""
+节假日数据二进制快照
+
+把 holiday/*.json 编译为一个紧凑的二进制文件，加载时通过 mmap 映射，不再解析 JSON，
+同一主机上的多个 worker 进程共享同一份页缓存。
+
+文件布局（小端序）：
+    文件头     magic(8s) 版本(H) 年份数(H) 条目数(I) 名称数(I) 字符串区大小(I)
+    年份表     每个年份一条：年份(H) 保留(H) 首条目下标(I) 条目数(I) 修改时间ns(q) 文件大小(Q) SHA-256(32s)
+    日期表     每条 8 字节：日期序数(i) 标志(B，bit0=放假) 填充(x) 名称编号(H)，按源文件中的顺序
+    字符串表   名称数+1 个偏移(I)，随后是 UTF-8 编码的名称
+
+每个年份记录源文件的修改时间、大小和内容摘要，加载方据此判断快照是否过期。
+
+用法：
+    python holiday_snapshot.py [数据目录] [快照文件]
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple, Iterator, NamedTuple
+
+MAGIC = b"HOLSNAP\x00"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sHHIII")
+_YEAR = struct.Struct("<HHIIqQ32s")
+_ENTRY = struct.Struct("<iBxH")
+_OFFSET = struct.Struct("<I")
+
+_FLAG_OFF_DAY = 1
+
+
+class SnapshotYear(NamedTuple):
+    """快照中一个年份的元数据"""
+    entry_start: int   # 首条目下标
+    entry_count: int   # 条目数
+    mtime_ns: int      # 编译时源文件的修改时间
+    size: int          # 编译时源文件的大小
+    digest: str        # 源文件内容的 SHA-256
+
+
+def parse_days(data: Dict[str, Any]) -> List[Tuple[int, bool, str]]:
+    """
+    提取节假日数据中的日期条目
+
+    Args:
+        data: 一个年份的节假日数据
+
+    Returns:
+        [(日期序数, 是否放假, 名称)]，保持源文件顺序，日期无效的条目被跳过
+    """
+    days = []
+    for day_info in data.get("days", []):
+        try:
+            day = date.fromisoformat(day_info.get("date", ""))
+        except (TypeError, ValueError):
+            continue
+        days.append((day.toordinal(), bool(day_info.get("isOffDay", False)), day_info.get("name", "")))
+    return days
+
+
+def compile_snapshot(holiday_dir: str = "holiday", output_path: str = "holiday.snapshot") -> Dict[str, Any]:
+    """
+    把数据目录中的全部年份编译为二进制快照，先写临时文件再原子替换
+
+    Args:
+        holiday_dir: 节假日数据文件目录
+        output_path: 快照文件路径
+
+    Returns:
+        编译统计信息
+    """
+    sources = []
+    for file_path in Path(holiday_dir).glob("*.json"):
+        try:
+            sources.append((int(file_path.stem), file_path))
+        except ValueError:
+            continue
+    sources.sort()
+
+    names: Dict[str, int] = {}
+    years = []
+    entries = []
+    for year, file_path in sources:
+        with open(file_path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            raw = f.read()
+        days = parse_days(json.loads(raw.decode("utf-8")))
+        years.append(_YEAR.pack(year, 0, len(entries), len(days), stat.st_mtime_ns, stat.st_size,
+                                hashlib.sha256(raw).digest()))
+        for ordinal, is_off_day, name in days:
+            name_id = names.setdefault(name, len(names))
+            entries.append(_ENTRY.pack(ordinal, _FLAG_OFF_DAY if is_off_day else 0, name_id))
+
+    encoded = [name.encode("utf-8") for name in names]
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    strings = b"".join(_OFFSET.pack(offset) for offset in offsets) + b"".join(encoded)
+
+    header = _HEADER.pack(MAGIC, VERSION, len(years), len(entries), len(names), len(strings))
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(b"".join(years))
+        f.write(b"".join(entries))
+        f.write(strings)
+    os.replace(tmp_path, output_path)
+
+    return {
+        "years": len(years),
+        "days": len(entries),
+        "names": len(names),
+        "bytes": len(header) + len(years) * _YEAR.size + len(entries) * _ENTRY.size + len(strings)
+    }
+
+
+class HolidaySnapshot:
+    """只读映射的节假日二进制快照"""
+
+    def __init__(self, path: str):
+        """
+        打开并映射快照文件
+
+        Args:
+            path: 快照文件路径
+
+        Raises:
+            ValueError: 文件格式或版本不匹配
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _parse(self):
+        """解析文件头、年份表和字符串表，日期表在读取年份时按需解码"""
+        buf = self._mmap
+        if len(buf) < _HEADER.size:
+            raise ValueError("快照文件不完整")
+        magic, version, year_count, entry_count, name_count, strings_size = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("快照文件格式或版本不匹配")
+
+        entries_offset = _HEADER.size + year_count * _YEAR.size
+        strings_offset = entries_offset + entry_count * _ENTRY.size
+        if len(buf) != strings_offset + strings_size:
+            raise ValueError("快照文件不完整")
+
+        self.years: Dict[int, SnapshotYear] = {}
+        for year, _, entry_start, count, mtime_ns, size, digest in _YEAR.iter_unpack(
+                buf[_HEADER.size:entries_offset]):
+            self.years[year] = SnapshotYear(entry_start, count, mtime_ns, size, digest.hex())
+
+        offsets = [offset for (offset,) in _OFFSET.iter_unpack(
+            buf[strings_offset:strings_offset + (name_count + 1) * _OFFSET.size])]
+        blob_offset = strings_offset + (name_count + 1) * _OFFSET.size
+        self.names: List[str] = [
+            buf[blob_offset + offsets[i]:blob_offset + offsets[i + 1]].decode("utf-8")
+            for i in range(name_count)
+        ]
+        self._entries_offset = entries_offset
+
+    def get_year(self, year: int) -> Optional[SnapshotYear]:
+        """获取快照中指定年份的元数据，没有该年份时为 None"""
+        return self.years.get(year)
+
+    def iter_days(self, year: int) -> Iterator[Tuple[int, bool, str]]:
+        """
+        遍历快照中指定年份的日期条目
+
+        Args:
+            year: 年份
+
+        Returns:
+            (日期序数, 是否放假, 名称) 的迭代器，保持源文件顺序
+        """
+        meta = self.years.get(year)
+        if meta is None:
+            return iter(())
+        start = self._entries_offset + meta.entry_start * _ENTRY.size
+        names = self.names
+        return (
+            (ordinal, bool(flags & _FLAG_OFF_DAY), names[name_id])
+            for ordinal, flags, name_id in _ENTRY.iter_unpack(
+                self._mmap[start:start + meta.entry_count * _ENTRY.size])
+        )
+
+    def close(self):
+        """解除映射"""
+        self._mmap.close()
+
+
+def open_snapshot(path: Optional[str]) -> Optional[HolidaySnapshot]:
+    """
+    打开快照文件，文件不存在或无法使用时返回 None
+
+    Args:
+        path: 快照文件路径，为空时不使用快照
+
+    Returns:
+        快照对象或 None
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return HolidaySnapshot(path)
+    except Exception as e:
+        print(f"节假日快照不可用，改为读取 JSON: {path}: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    source_dir = sys.argv[1] if len(sys.argv) > 1 else "holiday"
+    snapshot_path = sys.argv[2] if len(sys.argv) > 2 else "holiday.snapshot"
+    stats = compile_snapshot(source_dir, snapshot_path)
+    print(f"已生成节假日快照 {snapshot_path}: {stats['years']} 个年份, {stats['days']} 条日期, "
+          f"{stats['names']} 个名称, {stats['bytes']} 字节")
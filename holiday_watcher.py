@@ -0,0 +1,101 @@
+"""
+节假日数据文件监视
+
+在后台线程中监视节假日数据目录，文件变化后调用 HolidayLoader.refresh 重新加载发生变化的年份。
+安装了 watchfiles 时使用系统文件事件（inotify 等），否则按固定间隔比较文件的修改时间和大小。
+"""
+
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from holiday_loader import HolidayLoader
+
+try:
+    import watchfiles
+except ImportError:  # 可选依赖，未安装时退回轮询
+    watchfiles = None
+
+
+class HolidayWatcher:
+    """节假日数据目录监视器"""
+
+    def __init__(self, loader: HolidayLoader, interval: float = 5.0):
+        """
+        初始化监视器
+
+        Args:
+            loader: 节假日加载器
+            interval: 轮询间隔（秒），使用 watchfiles 时为事件合并的等待时间上限
+        """
+        self.loader = loader
+        self.interval = interval
+        self.mode = "watchfiles" if watchfiles is not None else "polling"
+        self.last_check: Optional[float] = None  # 最近一次检查的时间戳
+        self.last_changed: Optional[float] = None  # 最近一次数据变化的时间戳
+        self.reloads = 0  # 数据发生变化的次数
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """启动后台监视线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="holiday-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """停止后台监视线程"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def check(self):
+        """检查一次数据目录，重新加载发生变化的年份"""
+        try:
+            changed = self.loader.refresh()
+        except Exception as e:
+            print(f"节假日数据检查失败: {e}")
+            return
+        self.last_check = time.time()
+        if changed:
+            self.last_changed = self.last_check
+            self.reloads += 1
+
+    def _run(self):
+        """后台线程入口"""
+        if watchfiles is not None and self.loader.holiday_dir.is_dir():
+            try:
+                for _ in watchfiles.watch(
+                    self.loader.holiday_dir,
+                    stop_event=self._stop,
+                    rust_timeout=int(self.interval * 1000),
+                    yield_on_timeout=True
+                ):
+                    # 事件只作为触发信号，具体哪些年份变化由 refresh 比较文件签名决定
+                    self.check()
+                return
+            except Exception as e:
+                print(f"文件事件监视不可用，改为轮询: {e}")
+                self.mode = "polling"
+
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def status(self) -> Dict[str, Any]:
+        """
+        获取监视器状态
+
+        Returns:
+            运行模式、检查间隔、最近检查和变化时间等信息
+        """
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "mode": self.mode,
+            "interval": self.interval,
+            "last_check": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.last_check)) if self.last_check else None,
+            "last_changed": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.last_changed)) if self.last_changed else None,
+            "reloads": self.reloads
+        }
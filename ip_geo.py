@@ -0,0 +1,283 @@
+"""
+离线IP地理位置与ASN查询
+
+把 IP 段 CSV 编译为二进制区间库，运行时以 mmap 映射，多个 worker 共享同一份页缓存，完全离线。
+IPv4 和 IPv6 各有一张按起始地址排序的区间表，查询时在映射内存上二分查找，热门IP再经过一层 LRU 缓存。
+未设置 IP_GEO_DB 时不加载任何数据，接口也不做查询。
+
+CSV 每行：起始IP,结束IP,国家,地区,ASN,AS组织（# 开头的行和表头会被跳过）
+
+文件布局（小端序）：
+    文件头     magic(8s) 版本(H) 保留(H) IPv4区间数(I) IPv6区间数(I) 记录数(I) 名称数(I) 字符串区大小(I)
+    IPv4表     起始地址 uint32 × n，结束地址 uint32 × n，记录编号 uint32 × n
+    IPv6表     起始地址 16字节大端 × n，结束地址 16字节大端 × n，记录编号 uint32 × n
+    记录表     每条：国家(I) 地区(I) ASN(I) AS组织(I)，字符串以名称编号表示
+    字符串表   名称数+1 个偏移(I)，随后是 UTF-8 编码的名称
+
+用法：
+    python ip_geo.py 输入.csv 输出.ipdb
+"""
+
+import csv
+import ipaddress
+import mmap
+import os
+import struct
+import sys
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
+
+MAGIC = b"IPGEODB\x00"
+VERSION = 1
+
+# 编译好的区间库路径，未设置时关闭地理位置查询
+IP_GEO_DB = os.getenv("IP_GEO_DB", "")
+# 查询结果缓存的最大条目数
+IP_GEO_CACHE_SIZE = int(os.getenv("IP_GEO_CACHE_SIZE", "4096"))
+
+_HEADER = struct.Struct("<8sHHIIIII")
+_RECORD = struct.Struct("<IIII")
+_UINT32 = struct.Struct("<I")
+
+
+def compile_database(csv_path: str, output_path: str) -> Dict[str, Any]:
+    """
+    把 IP 段 CSV 编译为二进制区间库，先写临时文件再原子替换
+
+    Args:
+        csv_path: 输入 CSV 文件
+        output_path: 输出文件
+
+    Returns:
+        编译统计信息
+
+    Raises:
+        ValueError: 区间格式错误或存在重叠
+    """
+    names: Dict[str, int] = {"": 0}
+    records: Dict[Tuple[int, int, int, int], int] = {}
+    ranges: Dict[int, List[Tuple[int, int, int]]] = {4: [], 6: []}
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for line_number, row in enumerate(csv.reader(f), 1):
+            if not row or row[0].startswith("#"):
+                continue
+            try:
+                start = ipaddress.ip_address(row[0].strip())
+                end = ipaddress.ip_address(row[1].strip())
+            except (ValueError, IndexError):
+                if line_number == 1:
+                    continue  # 表头
+                raise ValueError(f"第 {line_number} 行的IP段格式错误")
+            if start.version != end.version or int(start) > int(end):
+                raise ValueError(f"第 {line_number} 行的IP段无效")
+
+            fields = [value.strip() for value in row[2:6]] + [""] * (4 - len(row[2:6]))
+            country, region, asn, org = fields
+            if asn[:2].upper() == "AS":
+                asn = asn[2:]
+            if asn and not asn.isdigit():
+                raise ValueError(f"第 {line_number} 行的ASN格式错误")
+            key = (
+                names.setdefault(country, len(names)),
+                names.setdefault(region, len(names)),
+                int(asn or 0),
+                names.setdefault(org, len(names))
+            )
+            ranges[start.version].append((int(start), int(end), records.setdefault(key, len(records))))
+
+    for version, items in ranges.items():
+        items.sort()
+        for previous, current in zip(items, items[1:]):
+            if current[0] <= previous[1]:
+                raise ValueError(f"IPv{version} 区间重叠: {ipaddress.ip_address(current[0])}")
+
+    encoded = [name.encode("utf-8") for name in names]
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    strings = b"".join(_UINT32.pack(offset) for offset in offsets) + b"".join(encoded)
+
+    v4, v6 = ranges[4], ranges[6]
+    chunks = [
+        _HEADER.pack(MAGIC, VERSION, 0, len(v4), len(v6), len(records), len(names), len(strings)),
+        struct.pack(f"<{len(v4)}I", *(start for start, _, _ in v4)),
+        struct.pack(f"<{len(v4)}I", *(end for _, end, _ in v4)),
+        struct.pack(f"<{len(v4)}I", *(record for _, _, record in v4)),
+        b"".join(start.to_bytes(16, "big") for start, _, _ in v6),
+        b"".join(end.to_bytes(16, "big") for _, end, _ in v6),
+        struct.pack(f"<{len(v6)}I", *(record for _, _, record in v6)),
+        b"".join(_RECORD.pack(*key) for key in records),
+        strings,
+    ]
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_path, output_path)
+
+    return {
+        "ipv4_ranges": len(v4),
+        "ipv6_ranges": len(v6),
+        "records": len(records),
+        "bytes": sum(len(chunk) for chunk in chunks)
+    }
+
+
+class _KeyTable:
+    """映射内存中定宽大端键的只读序列，供 bisect 直接比较字节串"""
+
+    def __init__(self, buf: mmap.mmap, offset: int, count: int, width: int):
+        self._buf = buf
+        self._offset = offset
+        self._count = count
+        self._width = width
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> bytes:
+        start = self._offset + index * self._width
+        return self._buf[start:start + self._width]
+
+
+class IPGeoDatabase:
+    """只读映射的IP区间库"""
+
+    def __init__(self, path: str, cache_size: int = IP_GEO_CACHE_SIZE):
+        """
+        打开并映射区间库
+
+        Args:
+            path: 编译好的区间库文件
+            cache_size: 查询结果缓存的最大条目数
+
+        Raises:
+            ValueError: 文件格式或版本不匹配
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except Exception:
+            self._mmap.close()
+            raise
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    def _parse(self):
+        """解析文件头，建立各张表在映射内存中的视图"""
+        buf = self._mmap
+        if len(buf) < _HEADER.size:
+            raise ValueError("IP库文件不完整")
+        magic, version, _, v4_count, v6_count, record_count, name_count, strings_size = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("IP库文件格式或版本不匹配")
+        expected = (_HEADER.size + v4_count * 12 + v6_count * 36 + record_count * _RECORD.size
+                    + strings_size)
+        if len(buf) != expected:
+            raise ValueError("IP库文件不完整")
+
+        offset = _HEADER.size
+        view = memoryview(buf)
+        if sys.byteorder == "little":
+            # 小端主机上直接把映射内存视为 uint32 数组，二分查找不复制数据
+            self._v4_starts = view[offset:offset + v4_count * 4].cast("I")
+            self._v4_ends = view[offset + v4_count * 4:offset + v4_count * 8].cast("I")
+            self._v4_records = view[offset + v4_count * 8:offset + v4_count * 12].cast("I")
+        else:
+            self._v4_starts, self._v4_ends, self._v4_records = (
+                struct.unpack_from(f"<{v4_count}I", buf, offset + i * v4_count * 4) for i in range(3)
+            )
+        offset += v4_count * 12
+
+        self._v6_starts = _KeyTable(buf, offset, v6_count, 16)
+        self._v6_ends = _KeyTable(buf, offset + v6_count * 16, v6_count, 16)
+        offset += v6_count * 32
+        self._v6_records = struct.unpack_from(f"<{v6_count}I", buf, offset)
+        offset += v6_count * 4
+
+        self._records = list(_RECORD.iter_unpack(buf[offset:offset + record_count * _RECORD.size]))
+        offset += record_count * _RECORD.size
+
+        offsets = struct.unpack_from(f"<{name_count + 1}I", buf, offset)
+        blob_offset = offset + (name_count + 1) * 4
+        self._names = [
+            buf[blob_offset + offsets[i]:blob_offset + offsets[i + 1]].decode("utf-8")
+            for i in range(name_count)
+        ]
+        self.ipv4_ranges = v4_count
+        self.ipv6_ranges = v6_count
+
+    def _lookup(self, ip: str) -> Optional[Dict[str, Any]]:
+        """
+        查询IP所在区间的地理位置和ASN
+
+        Args:
+            ip: IP地址字符串
+
+        Returns:
+            包含 country、region、asn、as_org 的字典（只读的共享对象，请勿修改），未收录或地址无效时为 None
+        """
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return None
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+
+        if address.version == 4:
+            key = int(address)
+            index = bisect_right(self._v4_starts, key) - 1
+            if index < 0 or key > self._v4_ends[index]:
+                return None
+            record_id = self._v4_records[index]
+        else:
+            key = address.packed
+            index = bisect_right(self._v6_starts, key) - 1
+            if index < 0 or key > self._v6_ends[index]:
+                return None
+            record_id = self._v6_records[index]
+
+        country, region, asn, org = self._records[record_id]
+        names = self._names
+        return {
+            "country": names[country] or None,
+            "region": names[region] or None,
+            "asn": asn or None,
+            "as_org": names[org] or None
+        }
+
+
+def open_database(path: str) -> Optional[IPGeoDatabase]:
+    """
+    打开区间库，未配置或无法使用时返回 None
+
+    Args:
+        path: 区间库文件路径，为空时关闭查询
+
+    Returns:
+        区间库对象或 None
+    """
+    if not path:
+        return None
+    try:
+        return IPGeoDatabase(path)
+    except Exception as e:
+        print(f"IP地理位置库不可用，已关闭查询: {path}: {e}")
+        return None
+
+
+# 全局实例，未配置时为 None
+ip_geo = open_database(IP_GEO_DB)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("用法: python ip_geo.py 输入.csv 输出.ipdb")
+        sys.exit(1)
+    stats = compile_database(sys.argv[1], sys.argv[2])
+    print(f"已生成IP地理位置库 {sys.argv[2]}: IPv4 {stats['ipv4_ranges']} 段, IPv6 {stats['ipv6_ranges']} 段, "
+          f"{stats['records']} 条记录, {stats['bytes']} 字节")
@@ -0,0 +1,274 @@
+"""
+农历（阴历）换算
+
+基于 1900-2100 年的压缩农历数据表，无需外部依赖即可完成公历到农历的换算。
+每年的月份长度与闰月在模块加载时展开为偏移量表，单个日期的换算只需两次二分查找。
+"""
+
+from bisect import bisect_right
+from datetime import date
+from typing import Dict, Any, Optional, List, Tuple, Iterator, NamedTuple
+
+# 1900-2100 年农历数据，每年一个整数：
+#   bit 0-3   闰月月份，0 表示当年无闰月
+#   bit 4-15  正月至十二月是否为大月（30天），正月在最高位
+#   bit 16    闰月是否为大月
+_LUNAR_INFO = (
+    0x04bd8, 0x04ae0, 0x0a570, 0x054d5, 0x0d260, 0x0d950, 0x16554, 0x056a0, 0x09ad0, 0x055d2,  # 1900-1909
+    0x04ae0, 0x0a5b6, 0x0a4d0, 0x0d250, 0x1d255, 0x0b540, 0x0d6a0, 0x0ada2, 0x095b0, 0x14977,  # 1910-1919
+    0x04970, 0x0a4b0, 0x0b4b5, 0x06a50, 0x06d40, 0x1ab54, 0x02b60, 0x09570, 0x052f2, 0x04970,  # 1920-1929
+    0x06566, 0x0d4a0, 0x0ea50, 0x16a95, 0x05ad0, 0x02b60, 0x186e3, 0x092e0, 0x1c8d7, 0x0c950,  # 1930-1939
+    0x0d4a0, 0x1d8a6, 0x0b550, 0x056a0, 0x1a5b4, 0x025d0, 0x092d0, 0x0d2b2, 0x0a950, 0x0b557,  # 1940-1949
+    0x06ca0, 0x0b550, 0x15355, 0x04da0, 0x0a5b0, 0x14573, 0x052b0, 0x0a9a8, 0x0e950, 0x06aa0,  # 1950-1959
+    0x0aea6, 0x0ab50, 0x04b60, 0x0aae4, 0x0a570, 0x05260, 0x0f263, 0x0d950, 0x05b57, 0x056a0,  # 1960-1969
+    0x096d0, 0x04dd5, 0x04ad0, 0x0a4d0, 0x0d4d4, 0x0d250, 0x0d558, 0x0b540, 0x0b6a0, 0x195a6,  # 1970-1979
+    0x095b0, 0x049b0, 0x0a974, 0x0a4b0, 0x0b27a, 0x06a50, 0x06d40, 0x0af46, 0x0ab60, 0x09570,  # 1980-1989
+    0x04af5, 0x04970, 0x064b0, 0x074a3, 0x0ea50, 0x06b58, 0x05ac0, 0x0ab60, 0x096d5, 0x092e0,  # 1990-1999
+    0x0c960, 0x0d954, 0x0d4a0, 0x0da50, 0x07552, 0x056a0, 0x0abb7, 0x025d0, 0x092d0, 0x0cab5,  # 2000-2009
+    0x0a950, 0x0b4a0, 0x0baa4, 0x0ad50, 0x055d9, 0x04ba0, 0x0a5b0, 0x15176, 0x052b0, 0x0a930,  # 2010-2019
+    0x07954, 0x06aa0, 0x0ad50, 0x05b52, 0x04b60, 0x0a6e6, 0x0a4e0, 0x0d260, 0x0ea65, 0x0d530,  # 2020-2029
+    0x05aa0, 0x076a3, 0x096d0, 0x04afb, 0x04ad0, 0x0a4d0, 0x1d0b6, 0x0d250, 0x0d520, 0x0dd45,  # 2030-2039
+    0x0b5a0, 0x056d0, 0x055b2, 0x049b0, 0x0a577, 0x0a4b0, 0x0aa50, 0x1b255, 0x06d20, 0x0ada0,  # 2040-2049
+    0x14b63, 0x09370, 0x049f8, 0x04970, 0x064b0, 0x168a6, 0x0ea50, 0x06b20, 0x1a6c4, 0x0aae0,  # 2050-2059
+    0x092e0, 0x0d2e3, 0x0c960, 0x0d557, 0x0d4a0, 0x0da50, 0x05d55, 0x056a0, 0x0a6d0, 0x055d4,  # 2060-2069
+    0x052d0, 0x0a9b8, 0x0a950, 0x0b4a0, 0x0b6a6, 0x0ad50, 0x055a0, 0x0aba4, 0x0a5b0, 0x052b0,  # 2070-2079
+    0x0b273, 0x06930, 0x07337, 0x06aa0, 0x0ad50, 0x14b55, 0x04b60, 0x0a570, 0x054e4, 0x0d160,  # 2080-2089
+    0x0e968, 0x0d520, 0x0daa0, 0x16aa6, 0x056d0, 0x04ae0, 0x0a9d4, 0x0a2d0, 0x0d150, 0x0f252,  # 2090-2099
+    0x0d520,                                                                                  # 2100
+)
+
+LUNAR_MIN_YEAR = 1900
+LUNAR_MAX_YEAR = LUNAR_MIN_YEAR + len(_LUNAR_INFO) - 1
+
+# 农历1900年正月初一对应公历1900-01-31
+_BASE_ORDINAL = date(1900, 1, 31).toordinal()
+
+HEAVENLY_STEMS = ("甲", "乙", "丙", "丁", "戊", "己", "庚", "辛", "壬", "癸")
+EARTHLY_BRANCHES = ("子", "丑", "寅", "卯", "辰", "巳", "午", "未", "申", "酉", "戌", "亥")
+ZODIAC_ANIMALS = ("鼠", "牛", "虎", "兔", "龙", "蛇", "马", "羊", "猴", "鸡", "狗", "猪")
+MONTH_NAMES = ("正月", "二月", "三月", "四月", "五月", "六月", "七月", "八月", "九月", "十月", "冬月", "腊月")
+_DAY_TENS = ("初", "十", "廿", "三")
+_DAY_UNITS = ("一", "二", "三", "四", "五", "六", "七", "八", "九", "十")
+DAY_NAMES = tuple(
+    {10: "初十", 20: "二十", 30: "三十"}.get(day, _DAY_TENS[(day - 1) // 10] + _DAY_UNITS[(day - 1) % 10])
+    for day in range(1, 31)
+)
+
+# 农历节日：(月, 日) -> 名称，闰月不过节；除夕单独判断
+LUNAR_FESTIVALS = {
+    (1, 1): "春节",
+    (1, 15): "元宵节",
+    (2, 2): "龙抬头",
+    (5, 5): "端午节",
+    (7, 7): "七夕节",
+    (7, 15): "中元节",
+    (8, 15): "中秋节",
+    (9, 9): "重阳节",
+    (12, 8): "腊八节",
+    (12, 23): "小年",
+}
+
+# 公历固定日期的节日，当天没有农历节日时使用
+SOLAR_FESTIVALS = {
+    (1, 1): "元旦",
+    (5, 1): "劳动节",
+    (10, 1): "国庆节",
+}
+
+
+class LunarDate(NamedTuple):
+    """农历日期"""
+    year: int
+    month: int
+    day: int
+    is_leap_month: bool
+    is_new_year_eve: bool
+
+
+def _expand_year(info: int) -> List[Tuple[int, bool, int]]:
+    """将压缩的年份数据展开为按顺序排列的 (月份, 是否闰月, 天数) 列表"""
+    leap_month = info & 0xf
+    months = []
+    for month in range(1, 13):
+        months.append((month, False, 30 if info & (0x10000 >> month) else 29))
+        if month == leap_month:
+            months.append((month, True, 30 if info & 0x10000 else 29))
+    return months
+
+
+def _build_tables() -> Tuple[List[int], List[List[Tuple[int, bool, int]]], List[List[int]]]:
+    """展开所有年份：每年正月初一的序数、月份列表和每月初一相对正月初一的偏移量"""
+    year_starts = [_BASE_ORDINAL]
+    year_months = []
+    month_offsets = []
+    for info in _LUNAR_INFO:
+        months = _expand_year(info)
+        offsets = []
+        offset = 0
+        for _, _, days in months:
+            offsets.append(offset)
+            offset += days
+        year_months.append(months)
+        month_offsets.append(offsets)
+        year_starts.append(year_starts[-1] + offset)
+    return year_starts, year_months, month_offsets
+
+
+# _YEAR_STARTS 比年份数多一项，最后一项为支持范围的结束序数（不含）
+_YEAR_STARTS, _YEAR_MONTHS, _MONTH_OFFSETS = _build_tables()
+
+MIN_DATE = date.fromordinal(_YEAR_STARTS[0])
+MAX_DATE = date.fromordinal(_YEAR_STARTS[-1] - 1)
+
+
+def solar_to_lunar(solar_date: date) -> LunarDate:
+    """
+    公历转农历
+
+    Args:
+        solar_date: 公历日期，支持 1900-01-31 至 2101-01-28
+
+    Returns:
+        农历日期
+
+    Raises:
+        ValueError: 日期超出支持范围
+    """
+    ordinal = solar_date.toordinal()
+    if not _YEAR_STARTS[0] <= ordinal < _YEAR_STARTS[-1]:
+        raise ValueError(f"农历换算仅支持 {MIN_DATE} 至 {MAX_DATE}")
+
+    year_index = bisect_right(_YEAR_STARTS, ordinal) - 1
+    offset = ordinal - _YEAR_STARTS[year_index]
+    offsets = _MONTH_OFFSETS[year_index]
+    month_index = bisect_right(offsets, offset) - 1
+    month, is_leap, _ = _YEAR_MONTHS[year_index][month_index]
+    return LunarDate(
+        LUNAR_MIN_YEAR + year_index,
+        month,
+        offset - offsets[month_index] + 1,
+        is_leap,
+        ordinal + 1 == _YEAR_STARTS[year_index + 1]
+    )
+
+
+def iter_lunar_dates(start: date, end: date) -> Iterator[Tuple[date, LunarDate]]:
+    """
+    逐日生成日期区间（含首尾）内的公历与农历日期
+
+    只在起点做一次查找，之后按月份表顺序递推，不会为每一天重新定位年份和月份。
+
+    Args:
+        start: 开始日期
+        end: 结束日期
+
+    Yields:
+        (公历日期, 农历日期)
+
+    Raises:
+        ValueError: 区间超出支持范围
+    """
+    if end < start:
+        return
+    if not MIN_DATE <= start <= end <= MAX_DATE:
+        raise ValueError(f"农历换算仅支持 {MIN_DATE} 至 {MAX_DATE}")
+
+    first = start.toordinal()
+    year_index = bisect_right(_YEAR_STARTS, first) - 1
+    offsets = _MONTH_OFFSETS[year_index]
+    month_index = bisect_right(offsets, first - _YEAR_STARTS[year_index]) - 1
+    day = first - _YEAR_STARTS[year_index] - offsets[month_index] + 1
+    months = _YEAR_MONTHS[year_index]
+    next_year_start = _YEAR_STARTS[year_index + 1]
+
+    for ordinal in range(start.toordinal(), end.toordinal() + 1):
+        month, is_leap, days = months[month_index]
+        yield date.fromordinal(ordinal), LunarDate(
+            LUNAR_MIN_YEAR + year_index, month, day, is_leap, ordinal + 1 == next_year_start
+        )
+        day += 1
+        if day > days:
+            day = 1
+            month_index += 1
+            if month_index == len(months):
+                year_index += 1
+                if year_index == len(_YEAR_MONTHS):
+                    return
+                months = _YEAR_MONTHS[year_index]
+                month_index = 0
+                next_year_start = _YEAR_STARTS[year_index + 1]
+
+
+def ganzhi_year(year: int) -> str:
+    """获取农历年份的干支纪年，如 2024 -> 甲辰"""
+    return HEAVENLY_STEMS[(year - 4) % 10] + EARTHLY_BRANCHES[(year - 4) % 12]
+
+
+def zodiac(year: int) -> str:
+    """获取农历年份的生肖"""
+    return ZODIAC_ANIMALS[(year - 4) % 12]
+
+
+def month_name(month: int, is_leap_month: bool = False) -> str:
+    """获取农历月份名称，如 正月、闰四月、腊月"""
+    return ("闰" if is_leap_month else "") + MONTH_NAMES[month - 1]
+
+
+def lunar_festival(lunar: LunarDate) -> str:
+    """获取农历节日名称，没有节日时返回空字符串"""
+    if lunar.is_leap_month:
+        return ""
+    if lunar.is_new_year_eve:
+        return "除夕"
+    return LUNAR_FESTIVALS.get((lunar.month, lunar.day), "")
+
+
+def _lunar_info(solar_date: date, lunar: Optional[LunarDate]) -> Dict[str, Any]:
+    """组装农历信息字典"""
+    solar_festival = SOLAR_FESTIVALS.get((solar_date.month, solar_date.day), "")
+    if lunar is None:
+        return {
+            "lunar_year": None,
+            "lunar_month": None,
+            "lunar_day": None,
+            "zodiac": None,
+            "festival": solar_festival,
+            "lunar_year_number": None,
+            "lunar_month_number": None,
+            "lunar_day_number": None,
+            "is_leap_month": None
+        }
+    return {
+        "lunar_year": ganzhi_year(lunar.year) + "年",
+        "lunar_month": month_name(lunar.month, lunar.is_leap_month),
+        "lunar_day": DAY_NAMES[lunar.day - 1],
+        "zodiac": zodiac(lunar.year),
+        "festival": lunar_festival(lunar) or solar_festival,
+        "lunar_year_number": lunar.year,
+        "lunar_month_number": lunar.month,
+        "lunar_day_number": lunar.day,
+        "is_leap_month": lunar.is_leap_month
+    }
+
+
+def get_lunar_info(solar_date: date) -> Dict[str, Any]:
+    """
+    获取指定公历日期的农历信息
+
+    Args:
+        solar_date: 公历日期
+
+    Returns:
+        农历信息字典，超出支持范围时农历字段为 None
+    """
+    try:
+        lunar = solar_to_lunar(solar_date)
+    except ValueError:
+        lunar = None
+    return _lunar_info(solar_date, lunar)
+
+
+def iter_lunar_info(start: date, end: date) -> Iterator[Dict[str, Any]]:
+    """逐日生成日期区间（含首尾）内的农历信息"""
+    for solar_date, lunar in iter_lunar_dates(start, end):
+        yield _lunar_info(solar_date, lunar)
@@ -1,17 +1,65 @@
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Request, HTTPException, Query, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 import uvicorn
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+import hashlib
 import json
+import os
+import secrets
+from functools import lru_cache
 from datetime import datetime, date
 import calendar
 from holiday_loader import holiday_loader
+from holiday_watcher import HolidayWatcher
+from fast_json import dumps, FastJSONResponse, RawJSONResponse
+from user_agent import parse_user_agent
+from client_ip import ClientIPMiddleware, client_ip_resolver
+from ip_geo import ip_geo
+from echo import read_echo_body, stream_echo_body, check_content_length, redact_headers, EchoStreamResponse
+from metrics import metrics, MetricsMiddleware, MetricsRegistry
+from profiling import ProfilingMiddleware, continuous_profiler, PROFILE_CONTINUOUS
+from timing import TimingMiddleware, access_log, phase
+from solar_terms import get_solar_terms
+from date_info import get_time_info, get_time_info_by_date
+
+# 启动时是否预加载全部节假日数据（设为 0 则按需懒加载）
+HOLIDAY_PRELOAD = os.getenv("HOLIDAY_PRELOAD", "1") not in ("0", "false", "False")
+# 是否监视节假日数据目录并在文件变化后热更新，以及轮询间隔（秒）
+HOLIDAY_WATCH = os.getenv("HOLIDAY_WATCH", "1") not in ("0", "false", "False")
+HOLIDAY_WATCH_INTERVAL = float(os.getenv("HOLIDAY_WATCH_INTERVAL", "5"))
+# 管理接口令牌，未设置时管理接口不可用
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+holiday_watcher = HolidayWatcher(holiday_loader, interval=HOLIDAY_WATCH_INTERVAL)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动时在线程池中预加载并索引所有年份的节假日数据，并启动数据文件监视和持续性能分析"""
+    if HOLIDAY_PRELOAD:
+        stats = await run_in_threadpool(holiday_loader.preload)
+        print(f"节假日数据预加载完成: {stats['loaded_years']}/{stats['years']} 个年份, 耗时 {stats['warmup_ms']}ms")
+    if HOLIDAY_WATCH:
+        holiday_watcher.start()
+    if PROFILE_CONTINUOUS:
+        continuous_profiler.start()
+    if access_log is not None:
+        access_log.start()
+    yield
+    if access_log is not None:
+        await run_in_threadpool(access_log.stop)
+    if PROFILE_CONTINUOUS:
+        await run_in_threadpool(continuous_profiler.stop)
+    if HOLIDAY_WATCH:
+        await run_in_threadpool(holiday_watcher.stop)
 
 app = FastAPI(
     title="API信息查看平台",
     description="一个用于查看请求IP地址、Headers等信息的API平台",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # 添加CORS中间件
@@ -23,83 +71,53 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def get_time_info() -> Dict[str, Any]:
-    """获取详细的时间信息"""
-    now = datetime.now()
-    today = now.date()
-    
-    # 使用新的节假日加载器
-    holiday_info = holiday_loader.get_holiday_info(today)
-    
-    # 获取农历信息（简化版）
-    lunar_info = get_lunar_date(today)
-    
-    return {
-        "timestamp": now.isoformat(),
-        "date": today.strftime("%Y-%m-%d"),
-        "time": now.strftime("%H:%M:%S"),
-        "timezone": "Asia/Shanghai",
-        "weekday": holiday_info["weekday"],
-        "year": now.year,
-        "month": now.month,
-        "day": now.day,
-        "hour": now.hour,
-        "minute": now.minute,
-        "second": now.second,
-        "microsecond": now.microsecond,
-        "is_holiday": holiday_info["is_holiday"],
-        "is_workday": holiday_info["is_workday"],
-        "holiday_name": holiday_info["holiday_name"],
-        "holiday_type": holiday_info["holiday_type"],
-        "holiday_source": holiday_info["source"],
-        "lunar_date": lunar_info,
-        "season": get_season(now.month),
-        "quarter": (now.month - 1) // 3 + 1,
-        "day_of_year": now.timetuple().tm_yday,
-        "week_of_year": now.isocalendar()[1]
-    }
+# 按受信任代理列表解析客户端IP，每个请求只解析一次
+app.add_middleware(ClientIPMiddleware, resolver=client_ip_resolver)
+# 管理员按请求开启采样分析（X-Profile 请求头或 profile 查询参数，需携带管理令牌）
+app.add_middleware(ProfilingMiddleware, admin_token=ADMIN_TOKEN)
+# 分阶段计时：Server-Timing 响应头和 JSON 访问日志（包住客户端IP解析，以便计入该阶段）
+app.add_middleware(TimingMiddleware, access_log=access_log)
+# 请求指标（最外层，统计包括其他中间件在内的完整耗时）
+app.add_middleware(MetricsMiddleware, registry=metrics)
 
-def get_lunar_date(solar_date: date) -> Dict[str, Any]:
-    """获取农历日期信息（简化版）"""
-    # 这里使用简化的农历计算，实际项目中可以使用专门的农历库
-    # 如 chinese_calendar 或 lunar_python
-    
-    # 简化实现：返回基本信息
-    return {
-        "lunar_year": "甲辰年",  # 2024年
-        "lunar_month": "五月",
-        "lunar_day": "十五",
-        "zodiac": "龙",
-        "festival": get_lunar_festival(solar_date)
-    }
+metrics.counter("holiday_loader_cache_requests_total", "节假日数据缓存查询次数（异步入口）")
+metrics.counter("holiday_loader_loads_total", "节假日数据文件加载次数")
+metrics.counter("holiday_loader_load_errors_total", "节假日数据文件加载失败次数")
+metrics.counter("holiday_loader_load_seconds_total", "节假日数据文件加载累计耗时（秒）")
+metrics.gauge("holiday_loader_years_loaded", "已加载的年份数")
+metrics.gauge("holiday_loader_warmup_seconds", "启动预加载耗时（秒）")
 
-def get_lunar_festival(solar_date: date) -> str:
-    """获取农历节日"""
-    month = solar_date.month
-    day = solar_date.day
-    
-    festivals = {
-        (1, 1): "元旦",
-        (2, 10): "春节",
-        (4, 4): "清明节",
-        (5, 1): "劳动节",
-        (6, 10): "端午节",
-        (9, 15): "中秋节",
-        (10, 1): "国庆节",
-    }
-    
-    return festivals.get((month, day), "")
-
-def get_season(month: int) -> str:
-    """获取季节"""
-    if month in [3, 4, 5]:
-        return "春季"
-    elif month in [6, 7, 8]:
-        return "夏季"
-    elif month in [9, 10, 11]:
-        return "秋季"
-    else:
-        return "冬季"
+def collect_loader_metrics(registry: MetricsRegistry):
+    """把节假日加载器的运行统计同步到指标"""
+    stats = holiday_loader.stats
+    for cache in ("year", "calendar"):
+        registry.set("holiday_loader_cache_requests_total", (("cache", cache), ("result", "hit")),
+                     stats[f"{cache}_hits"])
+        registry.set("holiday_loader_cache_requests_total", (("cache", cache), ("result", "miss")),
+                     stats[f"{cache}_misses"])
+    for source in ("json", "snapshot", "missing"):
+        registry.set("holiday_loader_loads_total", (("source", source),), stats[f"loads_{source}"])
+    registry.set("holiday_loader_load_errors_total", value=stats["load_errors"])
+    registry.set("holiday_loader_load_seconds_total", value=stats["load_seconds"])
+    registry.set("holiday_loader_years_loaded", value=len(holiday_loader.get_loaded_years()))
+    if holiday_loader.warmup_seconds is not None:
+        registry.set("holiday_loader_warmup_seconds", value=holiday_loader.warmup_seconds)
+
+metrics.add_collector(collect_loader_metrics)
+
+# 批量节假日检查每次请求允许的最大日期数量
+MAX_BATCH_DATES = int(os.getenv("MAX_BATCH_DATES", "50000"))
+# 批量节假日检查请求体的最大字节数，默认按每个日期 32 字节估算（含引号、逗号和缩进）
+MAX_BATCH_BYTES = int(os.getenv("MAX_BATCH_BYTES", str(MAX_BATCH_DATES * 32)))
+# 日历区间接口允许的最大天数（默认约100年）
+MAX_CALENDAR_DAYS = int(os.getenv("MAX_CALENDAR_DAYS", "36600"))
+# 年度节假日响应的客户端/CDN缓存时间（秒）
+YEAR_HOLIDAYS_MAX_AGE = int(os.getenv("YEAR_HOLIDAYS_MAX_AGE", "3600"))
+
+# 年份 -> (数据文件摘要, ETag, 编码后的响应体)
+_year_response_cache: Dict[int, Tuple[str, str, bytes]] = {}
+# (年份列表, 编码后的响应体)，年份列表在数据目录变化时整体替换，按对象身份判断是否过期
+_years_response_cache: Tuple[Optional[List[int]], bytes] = (None, b"")
 
 @app.get("/", response_class=HTMLResponse)
 async def root():
@@ -291,29 +309,34 @@ async def root():
 async def get_request_info(request: Request):
     """获取完整的请求信息"""
     client_ip = get_client_ip(request)
+    with phase("headers"):
+        headers = dict(request.headers)
+        cookies = request.cookies
     
     info = {
         "timestamp": datetime.now().isoformat(),
         "client_ip": client_ip,
         "method": request.method,
         "url": str(request.url),
-        "headers": dict(request.headers),
+        "headers": headers,
         "query_params": dict(request.query_params),
         "path_params": request.path_params,
-        "cookies": request.cookies,
+        "cookies": cookies,
         "client": {
             "host": request.client.host if request.client else None,
             "port": request.client.port if request.client else None,
         }
     }
+    if ip_geo is not None:
+        info["geo"] = ip_geo.lookup(client_ip)
     
-    return info
+    return FastJSONResponse(info)
 
 @app.get("/ip")
 async def get_ip(request: Request):
     """仅获取客户端IP地址"""
     client_ip = get_client_ip(request)
-    return {
+    info = {
         "timestamp": datetime.now().isoformat(),
         "client_ip": client_ip,
         "real_ip": request.headers.get("x-real-ip"),
@@ -321,30 +344,39 @@ async def get_ip(request: Request):
         "forwarded": request.headers.get("x-forwarded"),
         "client_host": request.client.host if request.client else None
     }
+    if ip_geo is not None:
+        info["geo"] = ip_geo.lookup(client_ip)
+    return FastJSONResponse(info)
 
 @app.get("/headers")
 async def get_headers(request: Request):
     """获取所有请求头信息"""
-    return {
+    with phase("headers"):
+        headers = dict(request.headers)
+    return FastJSONResponse({
         "timestamp": datetime.now().isoformat(),
-        "headers": dict(request.headers),
+        "headers": headers,
         "total_headers": len(request.headers)
-    }
+    })
 
 @app.get("/user-agent")
 async def get_user_agent(request: Request):
     """获取User-Agent信息"""
     user_agent = request.headers.get("user-agent", "Unknown")
-    return {
+    with phase("user_agent"):
+        parsed_info = parse_user_agent(user_agent)
+    return FastJSONResponse({
         "timestamp": datetime.now().isoformat(),
         "user_agent": user_agent,
-        "parsed_info": parse_user_agent(user_agent)
-    }
+        "parsed_info": parsed_info
+    })
 
 @app.get("/time")
 async def get_time():
     """获取时间信息和节假日判断"""
-    return get_time_info()
+    with phase("loader"):
+        await holiday_loader.load_year_async(date.today().year)
+    return FastJSONResponse(get_time_info())
 
 @app.get("/time/{date_str}")
 async def get_time_by_date(date_str: str):
@@ -352,166 +384,432 @@ async def get_time_by_date(date_str: str):
     try:
         # 解析日期字符串
         check_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        now = datetime.now()
-        
-        # 获取节假日信息
-        holiday_info = holiday_loader.get_holiday_info(check_date)
-        
-        # 获取农历信息
-        lunar_info = get_lunar_date(check_date)
-        
-        return {
-            "query_date": date_str,
-            "current_time": now.isoformat(),
-            "date": check_date.strftime("%Y-%m-%d"),
-            "weekday": {
-                "number": check_date.weekday(),
-                "name": ["周一", "周二", "周三", "周四", "周五", "周六", "周日"][check_date.weekday()],
-                "english": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"][check_date.weekday()]
-            },
-            "is_holiday": holiday_info["is_holiday"],
-            "is_workday": holiday_info["is_workday"],
-            "holiday_name": holiday_info["holiday_name"],
-            "holiday_type": holiday_info["holiday_type"],
-            "holiday_source": holiday_info["source"],
-            "lunar_date": lunar_info,
-            "season": get_season(check_date.month),
-            "quarter": (check_date.month - 1) // 3 + 1,
-            "day_of_year": check_date.timetuple().tm_yday,
-            "week_of_year": check_date.isocalendar()[1]
-        }
     except ValueError:
         raise HTTPException(status_code=400, detail="日期格式错误，请使用 YYYY-MM-DD 格式")
+    
+    with phase("loader"):
+        await holiday_loader.load_year_async(check_date.year)
+    return FastJSONResponse(get_time_info_by_date(check_date, date_str))
+
+@app.get("/solar-terms/{year}")
+async def get_year_solar_terms(year: int):
+    """获取指定年份的二十四节气（北京时间交节日期）"""
+    try:
+        body = render_solar_terms(year)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return RawJSONResponse(body)
+
+@app.get("/ready")
+async def readiness():
+    """就绪探针：节假日数据预加载完成后返回200，否则返回503"""
+    ready = holiday_loader.is_warm() if HOLIDAY_PRELOAD else True
+    warmup_seconds = holiday_loader.warmup_seconds
+    return FastJSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "preload": HOLIDAY_PRELOAD,
+            "available_years": len(await holiday_loader.get_available_years_async()),
+            "warmup_ms": round(warmup_seconds * 1000, 3) if warmup_seconds is not None else None
+        }
+    )
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus 文本格式的指标"""
+    # 直接给出 Content-Type 头：通过 media_type 传入时 Starlette 会在 text/ 类型后再追加一次 charset
+    return Response(content=metrics.render(), headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+def require_admin(token: Optional[str]):
+    """校验管理接口令牌"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="管理接口未启用，请设置 ADMIN_TOKEN")
+    if not token or not secrets.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="管理令牌无效")
+
+@app.get("/admin/holiday/status")
+async def holiday_status(x_admin_token: Optional[str] = Header(None)):
+    """查看已加载的节假日数据：每个年份的文件摘要、加载时间和耗时"""
+    require_admin(x_admin_token)
+    status = holiday_loader.get_status()
+    status["watcher"] = holiday_watcher.status()
+    return status
+
+@app.post("/admin/holiday/reload")
+async def reload_holidays(x_admin_token: Optional[str] = Header(None)):
+    """立即检查数据目录并重新加载发生变化的年份"""
+    require_admin(x_admin_token)
+    changed = await run_in_threadpool(holiday_loader.refresh)
+    return {
+        "changed_years": changed,
+        "available_years": len(await holiday_loader.get_available_years_async())
+    }
 
 @app.get("/holiday/years")
 async def get_available_years():
     """获取可用的节假日数据年份"""
-    return {
-        "available_years": holiday_loader.get_available_years(),
-        "total_years": len(holiday_loader.get_available_years())
-    }
+    global _years_response_cache
+    with phase("loader"):
+        years = await holiday_loader.get_available_years_async()
+    cached_years, body = _years_response_cache
+    if cached_years is not years:
+        body = dumps({
+            "available_years": years,
+            "total_years": len(years)
+        })
+        _years_response_cache = (years, body)
+    return RawJSONResponse(body)
 
 @app.get("/holiday/{year}")
-async def get_year_holidays(year: int):
+async def get_year_holidays(year: int, request: Request):
     """获取指定年份的所有节假日信息"""
     try:
-        holidays = holiday_loader.get_year_holidays(year)
-        return {
-            "year": year,
-            "total_days": len(holidays),
-            "holidays": holidays,
-            "holiday_count": len([h for h in holidays if h["is_holiday"]]),
-            "workday_count": len([h for h in holidays if h["is_workday"]])
-        }
+        with phase("loader"):
+            await holiday_loader.load_year_async(year)
+        etag, body = render_year_holidays(year)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"获取节假日数据失败: {str(e)}")
+    
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={YEAR_HOLIDAYS_MAX_AGE}"
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.get("/holiday/check/{date_str}")
 async def check_holiday(date_str: str):
     """检查指定日期是否为节假日"""
     try:
         check_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        holiday_info = holiday_loader.is_holiday(check_date)
+        with phase("loader"):
+            await holiday_loader.load_year_async(check_date.year)
+            holiday_info = holiday_loader.is_holiday(check_date)
         
-        return {
+        return FastJSONResponse({
             "date": date_str,
             "is_holiday": holiday_info["is_holiday"],
             "is_workday": holiday_info["is_workday"],
             "holiday_name": holiday_info["holiday_name"],
             "type": holiday_info["type"],
             "source": holiday_info["source"]
-        }
+        })
     except ValueError:
         raise HTTPException(status_code=400, detail="日期格式错误，请使用 YYYY-MM-DD 格式")
 
-@app.post("/echo")
-async def echo_request(request: Request):
-    """回显POST请求的数据"""
+@app.post("/holiday/check")
+async def check_holidays_batch(request: Request):
+    """
+    批量检查日期是否为节假日
+    
+    请求体为日期字符串组成的JSON数组，或每行一个日期的纯文本。
+    单个日期格式错误时只在该条结果中返回 error，不影响其他日期。
+    """
+    # 先按请求头声明的长度拒绝，再边读边计数，超过上限立即返回 413，不缓冲或解析超大请求体
+    check_content_length(request, MAX_BATCH_BYTES)
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > MAX_BATCH_BYTES:
+            raise HTTPException(status_code=413, detail=f"请求体不能超过 {MAX_BATCH_BYTES} 字节")
+        chunks.append(chunk)
+    body = b"".join(chunks)
+    content_type = request.headers.get("content-type", "")
+    
+    if "application/json" in content_type:
+        try:
+            items = json.loads(body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"无法解析请求数据: {str(e)}")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="请求体必须是日期字符串组成的JSON数组")
+    else:
+        try:
+            text = body.decode("utf-8")
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="请求体必须是UTF-8编码的文本")
+        items = [line.strip() for line in text.splitlines() if line.strip()]
+    
+    if len(items) > MAX_BATCH_DATES:
+        raise HTTPException(status_code=413, detail=f"单次最多检查 {MAX_BATCH_DATES} 个日期")
+    
+    # 先整体解析为日期序数，再一次性在日历位图中查询
+    ordinals = parse_date_ordinals(items)
+    with phase("loader"):
+        calendar = await holiday_loader.get_calendar_async()
+        lookups = iter(calendar.bulk_lookup_ordinals(
+            [ordinal for ordinal in ordinals if ordinal is not None]
+        ))
+    
+    results = []
+    error_count = 0
+    for item, ordinal in zip(items, ordinals):
+        if ordinal is None:
+            error_count += 1
+            results.append({"date": item, "error": "日期格式错误，请使用 YYYY-MM-DD 格式"})
+            continue
+        holiday_info = next(lookups)
+        results.append({
+            "date": item,
+            "is_holiday": holiday_info["is_holiday"],
+            "is_workday": holiday_info["is_workday"],
+            "holiday_name": holiday_info["holiday_name"],
+            "type": holiday_info["type"],
+            "source": holiday_info["source"]
+        })
+    
+    return FastJSONResponse({
+        "total": len(items),
+        "error_count": error_count,
+        "results": results
+    })
+
+@app.get("/calendar")
+async def get_calendar_range(
+    start: str = Query(..., description="开始日期，格式 YYYY-MM-DD"),
+    end: str = Query(..., description="结束日期，格式 YYYY-MM-DD"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="输出格式：json 数组或 ndjson 每行一条")
+):
+    """按天流式返回日期区间（含首尾）内的节假日信息，包括周末和普通工作日"""
     try:
-        body = await request.body()
-        content_type = request.headers.get("content-type", "")
-        
-        if "application/json" in content_type:
-            json_data = await request.json()
-            data = {"json_data": json_data}
-        else:
-            data = {"raw_data": body.decode()}
-        
-        return {
-            "timestamp": datetime.now().isoformat(),
-            "method": request.method,
-            "content_type": content_type,
-            "content_length": len(body),
-            "data": data,
-            "headers": dict(request.headers)
-        }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"无法解析请求数据: {str(e)}")
+        start_date = datetime.strptime(start, "%Y-%m-%d").date()
+        end_date = datetime.strptime(end, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="日期格式错误，请使用 YYYY-MM-DD 格式")
+    
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="结束日期不能早于开始日期")
+    if (end_date - start_date).days + 1 > MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail=f"日期区间不能超过 {MAX_CALENDAR_DAYS} 天")
+    
+    with phase("loader"):
+        await holiday_loader.get_calendar_async()
+    records = holiday_loader.iter_holiday_info(start_date, end_date)
+    if format == "ndjson":
+        return StreamingResponse(stream_ndjson(records), media_type="application/x-ndjson")
+    return StreamingResponse(stream_json_array(records), media_type="application/json")
 
-def get_client_ip(request: Request) -> str:
-    """获取客户端真实IP地址"""
-    # 检查各种可能的IP头
-    forwarded_for = request.headers.get("x-forwarded-for")
-    if forwarded_for:
-        return forwarded_for.split(",")[0].strip()
+@app.get("/workday/add")
+async def add_workdays(
+    from_date: str = Query(..., alias="from", description="起始日期，格式 YYYY-MM-DD（不计入）"),
+    n: int = Query(..., ge=-100000, le=100000, description="工作日数量，负数表示向前推算")
+):
+    """计算从指定日期起第N个工作日（考虑法定节假日和调休）"""
+    try:
+        start = datetime.strptime(from_date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="日期格式错误，请使用 YYYY-MM-DD 格式")
     
-    real_ip = request.headers.get("x-real-ip")
-    if real_ip:
-        return real_ip
+    try:
+        with phase("loader"):
+            await holiday_loader.get_calendar_async()
+            result = holiday_loader.add_workdays(start, n)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    forwarded = request.headers.get("x-forwarded")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
+    return FastJSONResponse({
+        "from": from_date,
+        "n": n,
+        "date": result.strftime("%Y-%m-%d"),
+        "calendar_days": (result - start).days
+    })
+
+@app.get("/workday/count")
+async def count_workdays(
+    start: str = Query(..., description="开始日期，格式 YYYY-MM-DD"),
+    end: str = Query(..., description="结束日期，格式 YYYY-MM-DD")
+):
+    """统计日期区间（含首尾）内的工作日数量（考虑法定节假日和调休）"""
+    try:
+        start_date = datetime.strptime(start, "%Y-%m-%d").date()
+        end_date = datetime.strptime(end, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="日期格式错误，请使用 YYYY-MM-DD 格式")
     
-    # 如果没有代理头，使用客户端IP
-    if request.client:
-        return request.client.host
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="结束日期不能早于开始日期")
     
-    return "unknown"
+    total_days = (end_date - start_date).days + 1
+    with phase("loader"):
+        await holiday_loader.get_calendar_async()
+        workday_count = holiday_loader.count_workdays(start_date, end_date)
+    return FastJSONResponse({
+        "start": start,
+        "end": end,
+        "total_days": total_days,
+        "workday_count": workday_count,
+        "off_day_count": total_days - workday_count
+    })
 
-def parse_user_agent(user_agent: str) -> Dict[str, Any]:
-    """简单解析User-Agent信息"""
-    info = {
-        "browser": "Unknown",
-        "os": "Unknown",
-        "device": "Unknown"
-    }
+@app.post("/echo")
+async def echo_request(
+    request: Request,
+    mode: str = Query("summary", pattern="^(summary|stream)$", description="summary 返回摘要和预览，stream 原样流式返回请求体")
+):
+    """回显POST请求的数据"""
+    if mode == "stream":
+        check_content_length(request)
+        return EchoStreamResponse(
+            stream_echo_body(request),
+            media_type=request.headers.get("content-type") or "application/octet-stream"
+        )
     
-    user_agent_lower = user_agent.lower()
+    body_info = await read_echo_body(request)
+    with phase("headers"):
+        headers = redact_headers(request.headers.items())
+    return FastJSONResponse({
+        "timestamp": datetime.now().isoformat(),
+        "method": request.method,
+        "content_type": request.headers.get("content-type", ""),
+        "content_length": body_info["content_length"],
+        "sha256": body_info["sha256"],
+        "data": body_info["data"],
+        "headers": headers
+    })
+
+def parse_date_ordinals(items: List[Any]) -> List[Optional[int]]:
+    """
+    批量解析 YYYY-MM-DD 格式的日期字符串
     
-    # 浏览器检测
-    if "chrome" in user_agent_lower:
-        info["browser"] = "Chrome"
-    elif "firefox" in user_agent_lower:
-        info["browser"] = "Firefox"
-    elif "safari" in user_agent_lower:
-        info["browser"] = "Safari"
-    elif "edge" in user_agent_lower:
-        info["browser"] = "Edge"
-    elif "opera" in user_agent_lower:
-        info["browser"] = "Opera"
+    Args:
+        items: 待解析的值列表
+        
+    Returns:
+        与输入等长的日期序数列表，无法解析的项为 None
+    """
+    ordinals: List[Optional[int]] = []
+    fromisoformat = date.fromisoformat
+    for item in items:
+        if not isinstance(item, str):
+            ordinals.append(None)
+            continue
+        try:
+            # 标准格式走C实现的快速路径，其余写法（如 2024-1-1）与单日接口一样交给 strptime
+            if len(item) == 10 and item[4] == "-" and item[7] == "-":
+                ordinals.append(fromisoformat(item).toordinal())
+            else:
+                ordinals.append(datetime.strptime(item, "%Y-%m-%d").toordinal())
+        except ValueError:
+            ordinals.append(None)
+    return ordinals
+
+def render_year_holidays(year: int) -> Tuple[str, bytes]:
+    """
+    生成指定年份节假日响应的 ETag 和响应体
     
-    # 操作系统检测
-    if "windows" in user_agent_lower:
-        info["os"] = "Windows"
-    elif "mac" in user_agent_lower:
-        info["os"] = "macOS"
-    elif "linux" in user_agent_lower:
-        info["os"] = "Linux"
-    elif "android" in user_agent_lower:
-        info["os"] = "Android"
-    elif "ios" in user_agent_lower:
-        info["os"] = "iOS"
+    有数据文件的年份按文件内容摘要缓存编码结果，文件内容不变时直接复用。
     
-    # 设备类型检测
-    if "mobile" in user_agent_lower or "android" in user_agent_lower or "iphone" in user_agent_lower:
-        info["device"] = "Mobile"
-    elif "tablet" in user_agent_lower or "ipad" in user_agent_lower:
-        info["device"] = "Tablet"
-    else:
-        info["device"] = "Desktop"
+    Args:
+        year: 年份
+        
+    Returns:
+        (ETag, JSON响应体)
+    """
+    digest = holiday_loader.get_file_digest(year)
+    cached = _year_response_cache.get(year)
+    if digest is not None and cached is not None and cached[0] == digest:
+        return cached[1], cached[2]
+    
+    with phase("loader"):
+        holidays = holiday_loader.get_year_holidays(year)
+    holiday_count = sum(1 for h in holidays if h["is_holiday"])
+    with phase("json"):
+        body = dumps({
+            "year": year,
+            "total_days": len(holidays),
+            "holidays": holidays,
+            "holiday_count": holiday_count,
+            "workday_count": len(holidays) - holiday_count
+        })
+    
+    if digest is None:
+        # 没有数据文件的年份不缓存，避免任意年份参数撑大缓存
+        return f'"{hashlib.sha256(body).hexdigest()[:32]}"', body
+    
+    etag = f'"{year}-{digest[:32]}"'
+    _year_response_cache[year] = (digest, etag, body)
+    return etag, body
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """判断 If-None-Match 请求头是否命中当前 ETag（按弱比较规则）"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+@lru_cache(maxsize=256)
+def render_solar_terms(year: int) -> bytes:
+    """
+    生成指定年份二十四节气的JSON响应体，按年份缓存编码结果
+    
+    Args:
+        year: 年份
+        
+    Returns:
+        JSON响应体
+        
+    Raises:
+        ValueError: 年份超出支持范围
+    """
+    return dumps({
+        "year": year,
+        "solar_terms": [
+            {"name": name, "date": term_date.strftime("%Y-%m-%d")}
+            for name, term_date in get_solar_terms(year)
+        ]
+    })
+
+def stream_ndjson(records: Iterator[Dict[str, Any]], batch_size: int = 256) -> Iterator[bytes]:
+    """将记录流编码为NDJSON，每批合并为一个数据块输出"""
+    batch = []
+    for record in records:
+        with phase("json"):
+            batch.append(dumps(record))
+        if len(batch) >= batch_size:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+def stream_json_array(records: Iterator[Dict[str, Any]], batch_size: int = 256) -> Iterator[bytes]:
+    """将记录流编码为JSON数组，每批合并为一个数据块输出"""
+    separator = b"["
+    batch = []
+    for record in records:
+        with phase("json"):
+            batch.append(dumps(record))
+        if len(batch) >= batch_size:
+            yield separator + b",".join(batch)
+            separator = b","
+            batch = []
+    if batch:
+        yield separator + b",".join(batch)
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
+def get_client_ip(request: Request) -> str:
+    """获取客户端真实IP地址（由 ClientIPMiddleware 按受信任代理列表解析）"""
+    client_ip = getattr(request.state, "client_ip", None)
+    if client_ip is not None:
+        return client_ip
     
-    return info
+    with phase("client_ip"):
+        values = request.headers.getlist(client_ip_resolver.header)
+        return client_ip_resolver.resolve(
+            request.client.host if request.client else None,
+            ",".join(values) if values else None
+        )
 
 if __name__ == "__main__":
     uvicorn.run(
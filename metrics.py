@@ -0,0 +1,423 @@
+"""
+Prometheus 指标
+
+每个 worker 进程维护自己的计数器，请求只在事件循环线程中更新指标，不需要加锁。
+设置 METRICS_DIR 后，计数器保存在该目录下每个进程独占的 mmap 文件中（原地写入 8 字节浮点数），
+/metrics 由任意一个 worker 汇总存活进程的文件和汇总文件：计数器和直方图求和，仪表取存活进程中的最大值。
+worker 退出后由主进程调用 merge_process 把它的计数器和直方图累加进汇总文件并删除它的文件（仪表丢弃），
+目录中的文件数不会随 worker 重启而增长。未设置时只输出当前进程的指标。
+
+使用多进程汇总时，每次启动服务前应清空 METRICS_DIR。
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple, Callable, Iterator
+
+# 多进程指标目录，未设置时只统计当前进程
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+# 请求耗时直方图的桶上界（秒）
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 各 worker 把采集型指标（如加载器统计）写入共享文件的最小间隔（秒）
+COLLECT_INTERVAL = 1.0
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_INITIAL_FILE_SIZE = 1 << 20
+_USED = struct.Struct("<I")
+_ENTRY_HEAD = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+# 已退出进程的计数器和直方图累加到该文件
+_AGGREGATE_FILENAME = "metrics-aggregate.db"
+
+
+@lru_cache(maxsize=4096)
+def _encode_key(name: str, labels: Labels) -> str:
+    """指标样本的存储键"""
+    return json.dumps([name, [list(pair) for pair in labels]], ensure_ascii=False, separators=(",", ":"))
+
+
+class _MemoryValues:
+    """当前进程内存中的指标值"""
+
+    def __init__(self):
+        self._values: Dict[str, float] = {}
+
+    def inc(self, key: str, amount: float):
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, key: str, value: float):
+        self._values[key] = value
+
+    def items(self) -> List[Tuple[str, float]]:
+        return list(self._values.items())
+
+
+class _MmapValues:
+    """
+    进程独占的 mmap 指标文件
+
+    布局：已用字节数(I)，随后是若干条目：键长度(I) 键(UTF-8，补齐到8字节) 值(d)。
+    新条目完整写入后才更新已用字节数，读取方只会看到完整的条目。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a+b")
+        if os.fstat(self._file.fileno()).st_size < _INITIAL_FILE_SIZE:
+            self._file.truncate(_INITIAL_FILE_SIZE)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._offsets: Dict[str, int] = {}
+        self._used = _USED.unpack_from(self._mmap, 0)[0] or 8
+        for key, value, offset in _iter_entries(self._mmap, self._used):
+            self._offsets[key] = offset
+
+    def _offset(self, key: str) -> int:
+        offset = self._offsets.get(key)
+        if offset is None:
+            encoded = key.encode("utf-8")
+            padded = len(encoded) + (-(_ENTRY_HEAD.size + len(encoded)) % 8)
+            size = _ENTRY_HEAD.size + padded + _VALUE.size
+            if self._used + size > len(self._mmap):
+                self._grow(self._used + size)
+            _ENTRY_HEAD.pack_into(self._mmap, self._used, len(encoded))
+            self._mmap[self._used + 4:self._used + 4 + len(encoded)] = encoded
+            offset = self._used + _ENTRY_HEAD.size + padded
+            _VALUE.pack_into(self._mmap, offset, 0.0)
+            self._used += size
+            _USED.pack_into(self._mmap, 0, self._used)
+            self._offsets[key] = offset
+        return offset
+
+    def _grow(self, required: int):
+        size = len(self._mmap)
+        while size < required:
+            size *= 2
+        self._mmap.close()
+        self._file.truncate(size)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+
+    def inc(self, key: str, amount: float):
+        offset = self._offset(key)
+        _VALUE.pack_into(self._mmap, offset, _VALUE.unpack_from(self._mmap, offset)[0] + amount)
+
+    def set(self, key: str, value: float):
+        _VALUE.pack_into(self._mmap, self._offset(key), value)
+
+    def items(self) -> List[Tuple[str, float]]:
+        return [(key, value) for key, value, _ in _iter_entries(self._mmap, self._used)]
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+def _iter_entries(buf, used: int) -> Iterator[Tuple[str, float, int]]:
+    """遍历指标文件中的条目：(键, 值, 值的偏移)"""
+    position = 8
+    while position < used:
+        length = _ENTRY_HEAD.unpack_from(buf, position)[0]
+        key = bytes(buf[position + 4:position + 4 + length]).decode("utf-8")
+        padded = length + (-(_ENTRY_HEAD.size + length) % 8)
+        offset = position + _ENTRY_HEAD.size + padded
+        yield key, _VALUE.unpack_from(buf, offset)[0], offset
+        position = offset + _VALUE.size
+
+
+def _read_file(path: str) -> List[Tuple[str, float]]:
+    """读取其他进程的指标文件"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < 8:
+        return []
+    return [(key, value) for key, value, _ in _iter_entries(data, _USED.unpack_from(data, 0)[0])]
+
+
+def _pid_alive(pid: int) -> bool:
+    """判断进程是否存活"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def clear_directory(directory: str) -> int:
+    """
+    删除多进程指标目录中的全部指标文件，应在启动 worker 之前调用
+
+    Args:
+        directory: 多进程指标目录
+
+    Returns:
+        删除的文件数
+    """
+    if not directory or not os.path.isdir(directory):
+        return 0
+    removed = 0
+    for filename in os.listdir(directory):
+        if filename.startswith("metrics-") and filename.endswith(".db"):
+            try:
+                os.remove(os.path.join(directory, filename))
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self, directory: str = ""):
+        """
+        Args:
+            directory: 多进程指标目录，为空时只在内存中统计
+        """
+        self.directory = directory
+        self._families: Dict[str, Tuple[str, str]] = {}  # 指标名 -> (类型, 说明)
+        self._collectors: List[Callable[["MetricsRegistry"], None]] = []
+        self._last_collect = 0.0
+        self._values = None
+        self._pid = None
+
+    def _storage(self):
+        """当前进程的指标存储，fork 后在子进程中重新创建"""
+        pid = os.getpid()
+        if self._pid != pid:
+            if self.directory:
+                os.makedirs(self.directory, exist_ok=True)
+                self._values = _MmapValues(os.path.join(self.directory, f"metrics-{pid}.db"))
+            else:
+                self._values = _MemoryValues()
+            self._pid = pid
+        return self._values
+
+    def counter(self, name: str, documentation: str):
+        """声明计数器"""
+        self._families[name] = ("counter", documentation)
+
+    def gauge(self, name: str, documentation: str):
+        """声明仪表"""
+        self._families[name] = ("gauge", documentation)
+
+    def histogram(self, name: str, documentation: str):
+        """声明直方图"""
+        self._families[name] = ("histogram", documentation)
+
+    def add_collector(self, collector: Callable[["MetricsRegistry"], None]):
+        """注册采集函数，在输出指标前（以及多进程模式下定期）调用，用于同步外部统计值"""
+        self._collectors.append(collector)
+
+    def inc(self, name: str, labels: Labels = (), amount: float = 1.0):
+        """计数器增加"""
+        self._storage().inc(_encode_key(name, labels), amount)
+
+    def set(self, name: str, labels: Labels = (), value: float = 0.0):
+        """设置仪表或累计值"""
+        self._storage().set(_encode_key(name, labels), value)
+
+    def observe(self, name: str, labels: Labels, value: float):
+        """直方图记录一个观测值（固定使用 LATENCY_BUCKETS），各桶按非累计方式存储，输出时再累加"""
+        storage = self._storage()
+        index = bisect_left(LATENCY_BUCKETS, value)
+        le = str(LATENCY_BUCKETS[index]) if index < len(LATENCY_BUCKETS) else "+Inf"
+        storage.inc(_encode_key(f"{name}_bucket", labels + (("le", le),)), 1.0)
+        storage.inc(_encode_key(f"{name}_sum", labels), value)
+        storage.inc(_encode_key(f"{name}_count", labels), 1.0)
+
+    def collect(self, force: bool = False):
+        """调用采集函数；多进程模式下由各 worker 定期调用，保证共享文件中的采集值不过时"""
+        now = time.monotonic()
+        if not force and now - self._last_collect < COLLECT_INTERVAL:
+            return
+        self._last_collect = now
+        for collector in self._collectors:
+            try:
+                collector(self)
+            except Exception as e:
+                print(f"指标采集失败: {e}")
+
+    def _is_gauge(self, key: str) -> bool:
+        """判断样本是否属于仪表；直方图的 _bucket/_sum/_count 样本不在声明中，与计数器一样处理"""
+        return self._families.get(json.loads(key)[0], ("counter", ""))[0] == "gauge"
+
+    def merge_process(self, pid: int) -> bool:
+        """
+        把已退出 worker 的计数器和直方图累加进汇总文件，然后删除它的指标文件，仪表直接丢弃
+
+        应由回收 worker 的主进程在补起新 worker 之前调用，避免进程号被复用时新 worker 接着旧文件计数。
+
+        Args:
+            pid: 已退出的 worker 进程号
+
+        Returns:
+            是否合并了指标文件
+        """
+        if not self.directory:
+            return False
+        path = os.path.join(self.directory, f"metrics-{pid}.db")
+        try:
+            items = _read_file(path)
+        except FileNotFoundError:
+            return False
+        aggregate = _MmapValues(os.path.join(self.directory, _AGGREGATE_FILENAME))
+        try:
+            for key, value in items:
+                if value and not self._is_gauge(key):
+                    aggregate.inc(key, value)
+        finally:
+            aggregate.close()
+        os.remove(path)
+        return True
+
+    def _gather(self) -> Dict[str, float]:
+        """汇总存活进程和已退出进程的指标值"""
+        if not self.directory:
+            return dict(self._storage().items())
+
+        self._storage()
+        totals: Dict[str, float] = {}
+        for filename in os.listdir(self.directory):
+            if not (filename.startswith("metrics-") and filename.endswith(".db")):
+                continue
+            path = os.path.join(self.directory, filename)
+            if filename != _AGGREGATE_FILENAME:
+                # 已退出但尚未合并的进程不计入，合并后由汇总文件计入
+                try:
+                    if not _pid_alive(int(filename[len("metrics-"):-len(".db")])):
+                        continue
+                except ValueError:
+                    continue
+            try:
+                items = _read_file(path)
+            except OSError:
+                continue
+            for key, value in items:
+                if self._is_gauge(key):
+                    # 仪表只取存活进程的最大值，汇总文件中没有仪表
+                    totals[key] = max(totals.get(key, value), value)
+                else:
+                    totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+    def render(self) -> str:
+        """
+        以 Prometheus 文本格式输出全部指标
+
+        Returns:
+            text/plain; version=0.0.4 格式的指标文本
+        """
+        self.collect(force=True)
+        samples: Dict[str, List[Tuple[str, Labels, float]]] = {}
+        for key, value in self._gather().items():
+            name, labels = json.loads(key)
+            family = name
+            for suffix in ("_bucket", "_sum", "_count"):
+                if name.endswith(suffix) and name[:-len(suffix)] in self._families:
+                    family = name[:-len(suffix)]
+                    break
+            samples.setdefault(family, []).append((name, tuple(tuple(pair) for pair in labels), value))
+
+        lines = []
+        for family, (kind, documentation) in self._families.items():
+            family_samples = samples.get(family)
+            if not family_samples:
+                continue
+            lines.append(f"# HELP {family} {documentation}")
+            lines.append(f"# TYPE {family} {kind}")
+            if kind == "histogram":
+                lines.extend(_render_histogram(family, family_samples))
+            else:
+                for name, labels, value in sorted(family_samples):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _render_histogram(family: str, samples: List[Tuple[str, Labels, float]]) -> List[str]:
+    """把非累计的桶计数转换为 Prometheus 的累计桶"""
+    series: Dict[Labels, Dict[str, Any]] = {}
+    for name, labels, value in samples:
+        if name.endswith("_bucket"):
+            base = tuple(pair for pair in labels if pair[0] != "le")
+            le = dict(labels)["le"]
+            series.setdefault(base, {"buckets": {}, "sum": 0.0, "count": 0.0})["buckets"][le] = value
+        elif name.endswith("_sum"):
+            series.setdefault(labels, {"buckets": {}, "sum": 0.0, "count": 0.0})["sum"] = value
+        else:
+            series.setdefault(labels, {"buckets": {}, "sum": 0.0, "count": 0.0})["count"] = value
+
+    lines = []
+    for labels in sorted(series):
+        data = series[labels]
+        cumulative = 0.0
+        for bound in [str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]:
+            cumulative += data["buckets"].get(bound, 0.0)
+            lines.append(f"{family}_bucket{_format_labels(labels + (('le', bound),))} {_format_value(cumulative)}")
+        lines.append(f"{family}_sum{_format_labels(labels)} {_format_value(data['sum'])}")
+        lines.append(f"{family}_count{_format_labels(labels)} {_format_value(data['count'])}")
+    return lines
+
+
+def _format_labels(labels: Labels) -> str:
+    """格式化标签"""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    """转义标签值中的反斜杠、换行和双引号"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """格式化样本值，整数不带小数部分"""
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+class MetricsMiddleware:
+    """记录每个路由的请求数、状态码和耗时"""
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            # 只使用路由模板作为标签，未匹配的路径合并为一个，避免标签基数失控
+            path = getattr(route, "path", None) or "<unmatched>"
+            method = scope["method"]
+            registry = self.registry
+            registry.inc("http_requests_total", (("method", method), ("route", path), ("status", str(status[0]))))
+            registry.observe("http_request_duration_seconds", (("method", method), ("route", path)), elapsed)
+            if registry.directory:
+                registry.collect()
+
+
+# 全局实例
+metrics = MetricsRegistry(METRICS_DIR)
+metrics.counter("http_requests_total", "HTTP请求数")
+metrics.histogram("http_request_duration_seconds", "HTTP请求耗时（秒）")
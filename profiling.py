@@ -0,0 +1,301 @@
+"""
+采样性能分析
+
+后台线程按固定间隔读取 sys._current_frames() 中目标线程的调用栈，按栈计数，输出为 flamegraph.pl、
+speedscope 等工具可直接读取的折叠栈格式（每行 "帧;帧;帧 次数"，从调用方到被调用方）。
+采样不修改被分析的代码，也不像 cProfile 那样给每次函数调用增加开销。
+
+两种用法：
+    按请求分析  管理员在请求头 X-Profile（或查询参数 profile）中指定 store 或 return，只对该请求采样：
+               store 把结果写入 PROFILE_DIR，文件名在响应头 X-Profile-File 中返回；
+               return 丢弃原响应体，直接返回折叠栈文本，原状态码放在响应头 X-Profile-Status 中。
+               需要同时在 X-Admin-Token 中携带管理令牌，否则忽略该标记，请求照常处理。
+    持续分析    设置 PROFILE_CONTINUOUS=1 后，每个 worker 以较低频率对所有线程持续采样，
+               每隔 PROFILE_FLUSH_SECONDS 秒把聚合结果写入 PROFILE_DIR 并清零。
+
+按请求分析只采样事件循环线程，同一时刻在该线程上运行的其他请求也会被计入；线程池中的同步代码不在采样范围内。
+"""
+
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional, Iterable
+from urllib.parse import parse_qs
+
+# 分析结果的输出目录（docker-compose 已挂载 ./logs）
+PROFILE_DIR = os.getenv("PROFILE_DIR", "logs")
+# 按请求分析的采样间隔（秒）
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))
+# 是否启用持续分析，以及持续分析的采样间隔和写出间隔（秒）
+PROFILE_CONTINUOUS = os.getenv("PROFILE_CONTINUOUS", "0") not in ("0", "false", "False")
+PROFILE_CONTINUOUS_INTERVAL = float(os.getenv("PROFILE_CONTINUOUS_INTERVAL", "0.02"))
+PROFILE_FLUSH_SECONDS = float(os.getenv("PROFILE_FLUSH_SECONDS", "60"))
+
+# 单个调用栈的最大深度，超出部分从根部截断
+MAX_STACK_DEPTH = 128
+
+_MODES = ("store", "return")
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class StackSampler:
+    """后台线程定期采样指定线程的调用栈并按栈计数"""
+
+    def __init__(self, interval: float, thread_ids: Optional[Iterable[int]] = None, name: str = "profiler"):
+        """
+        Args:
+            interval: 采样间隔（秒）
+            thread_ids: 要采样的线程，为 None 时采样除采样线程外的所有线程
+            name: 采样线程名
+        """
+        self.interval = interval
+        self.thread_ids = set(thread_ids) if thread_ids is not None else None
+        self.name = name
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[object, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """启动采样线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """停止采样线程"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        """采样线程入口"""
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        """采样一次所有目标线程的调用栈"""
+        own_id = threading.get_ident()
+        names = None
+        if self.thread_ids is None:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = []
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                continue
+            stack = self._collapse(frame)
+            if names is not None:
+                # 采样所有线程时以线程名作为根帧，区分事件循环、线程池和后台线程
+                stack = f"{names.get(thread_id, thread_id)};{stack}"
+            stacks.append(stack)
+
+        with self._lock:
+            self.samples += 1
+            self.counts.update(stacks)
+
+    def _collapse(self, frame) -> str:
+        """把调用栈转换为从根到叶、以分号分隔的帧标签"""
+        labels = []
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                label = label.replace(";", ":")
+                self._labels[code] = label
+            labels.append(label)
+            frame = frame.f_back
+        labels.reverse()
+        return ";".join(labels)
+
+    def take(self) -> Counter:
+        """取出目前为止的计数并清零"""
+        with self._lock:
+            counts = self.counts
+            self.counts = Counter()
+            self.samples = 0
+        return counts
+
+
+def render_collapsed(counts: Counter) -> str:
+    """
+    输出折叠栈文本
+
+    Args:
+        counts: 调用栈 -> 采样次数
+
+    Returns:
+        每行 "栈 次数"，按次数从多到少排列
+    """
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+
+def write_profile(directory: str, filename: str, counts: Counter) -> str:
+    """
+    把折叠栈写入输出目录，先写临时文件再原子替换
+
+    Returns:
+        写入的文件路径
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, filename)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render_collapsed(counts))
+    os.replace(tmp_path, path)
+    return path
+
+
+class ContinuousProfiler:
+    """低频持续采样所有线程，定期把聚合结果写入输出目录"""
+
+    def __init__(self, directory: str = PROFILE_DIR, interval: float = PROFILE_CONTINUOUS_INTERVAL,
+                 flush_seconds: float = PROFILE_FLUSH_SECONDS):
+        """
+        Args:
+            directory: 输出目录
+            interval: 采样间隔（秒）
+            flush_seconds: 写出间隔（秒）
+        """
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self.sampler = StackSampler(interval, name="continuous-profiler")
+        self.last_file: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """启动采样线程和写出线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.sampler.start()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="continuous-profiler-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """停止采样并写出剩余结果"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.sampler.stop(timeout)
+        self.flush()
+
+    def _run(self):
+        """写出线程入口"""
+        while not self._stop.wait(self.flush_seconds):
+            self.flush()
+
+    def flush(self):
+        """把当前聚合结果写入一个以进程号和时间命名的文件"""
+        counts = self.sampler.take()
+        if not counts:
+            return
+        filename = f"profile-{os.getpid()}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.collapsed"
+        try:
+            self.last_file = write_profile(self.directory, filename, counts)
+        except OSError as e:
+            print(f"性能分析结果写入失败: {e}")
+
+
+class ProfilingMiddleware:
+    """管理员可以对单个请求开启采样分析"""
+
+    def __init__(self, app, admin_token: str, directory: str = PROFILE_DIR, interval: float = PROFILE_INTERVAL):
+        """
+        Args:
+            app: ASGI 应用
+            admin_token: 管理令牌，为空时不允许按请求分析
+            directory: 分析结果的输出目录
+            interval: 采样间隔（秒）
+        """
+        self.app = app
+        self.admin_token = admin_token
+        self.directory = directory
+        self.interval = interval
+
+    def _requested_mode(self, scope) -> Optional[str]:
+        """读取分析标记并校验管理令牌，未请求或未授权时返回 None"""
+        mode = token = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                mode = value.decode("latin-1").strip().lower()
+            elif name == b"x-admin-token":
+                token = value.decode("latin-1")
+        if mode is None and b"profile=" in scope["query_string"]:
+            values = parse_qs(scope["query_string"].decode("latin-1")).get("profile")
+            mode = values[-1].lower() if values else None
+        if mode is None or not self.admin_token or token is None:
+            return None
+        if not secrets.compare_digest(token.encode("utf-8"), self.admin_token.encode("utf-8")):
+            return None
+        return mode if mode in _MODES else "store"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        mode = self._requested_mode(scope)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        path = _UNSAFE_CHARS.sub("_", scope["path"].strip("/")) or "root"
+        filename = (f"request-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{os.getpid()}-"
+                    f"{scope['method']}-{path[:64]}.collapsed")
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if mode == "store":
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-profile-file", filename.encode("latin-1"))
+                    ]
+            if mode == "store":
+                await send(message)
+
+        sampler = StackSampler(self.interval, thread_ids=[threading.get_ident()], name="request-profiler")
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            elapsed = time.perf_counter() - started
+
+        if mode == "store":
+            try:
+                write_profile(self.directory, filename, sampler.counts)
+            except OSError as e:
+                print(f"性能分析结果写入失败: {e}")
+            return
+
+        body = render_collapsed(sampler.counts).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"x-profile-status", str(status[0]).encode("latin-1")),
+                (b"x-profile-samples", str(sampler.samples).encode("latin-1")),
+                (b"x-profile-elapsed-ms", f"{elapsed * 1000:.3f}".encode("latin-1")),
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# 全局实例，PROFILE_CONTINUOUS=1 时在应用启动时开始采样
+continuous_profiler = ContinuousProfiler()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+生产环境启动器
+
+主进程先导入应用并预加载全部节假日数据，再绑定监听端口并 fork 出多个 uvicorn worker。
+预加载的索引、日历位图以及 mmap 映射的节假日快照和IP库都在 fork 之前建立，worker 以写时复制方式共享这些内存页，
+启动时也不再各自解析数据。fork 之前调用 gc.freeze()，避免垃圾回收触碰这些对象而破坏页共享。
+
+worker 处理完 MAX_REQUESTS 个请求（加上随机抖动，避免同时重启）后优雅退出，由主进程补起新的 worker；
+异常退出的 worker 同样会被补起。主进程收到 SIGTERM/SIGINT 时通知全部 worker 优雅退出，超时后强制结束。
+uvicorn 自带的多 worker 模式使用 spawn 启动子进程，既不能共享预加载的数据，也不会补起退出的 worker。
+
+用法：
+    python serve.py
+    python serve.py --workers 8 --limit-concurrency 1000 --max-requests 100000
+"""
+
+import argparse
+import gc
+import os
+import random
+import signal
+import time
+from typing import Dict
+
+import uvicorn
+
+# 监听地址和端口
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8080"))
+# worker 数量，默认与 CPU 核数相同
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+# 事件循环和 HTTP 解析器：auto 表示已安装 uvloop/httptools 时使用它们，否则使用 asyncio/h11
+UVICORN_LOOP = os.getenv("UVICORN_LOOP", "auto")
+UVICORN_HTTP = os.getenv("UVICORN_HTTP", "auto")
+# keep-alive 空闲连接的超时时间（秒）和监听队列长度
+KEEP_ALIVE = int(os.getenv("KEEP_ALIVE", "5"))
+BACKLOG = int(os.getenv("BACKLOG", "2048"))
+# 每个 worker 同时处理的最大连接数和请求数，超过时返回 503，0 表示不限制
+LIMIT_CONCURRENCY = int(os.getenv("LIMIT_CONCURRENCY", "0"))
+# worker 处理多少个请求后优雅重启，以及在此基础上增加的最大随机数，0 表示不重启
+MAX_REQUESTS = int(os.getenv("MAX_REQUESTS", "0"))
+MAX_REQUESTS_JITTER = int(os.getenv("MAX_REQUESTS_JITTER", "0"))
+# 停止服务时等待 worker 处理完进行中请求的时间（秒）
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+
+# worker 启动后存活不足该时间（秒）就退出时，延迟补起，避免启动失败时反复 fork
+_MIN_WORKER_LIFETIME = 1.0
+
+
+def resolve_loop(loop: str) -> str:
+    """解析事件循环实现，auto 时优先使用 uvloop"""
+    if loop != "auto":
+        return loop
+    try:
+        import uvloop  # noqa: F401
+        return "uvloop"
+    except ImportError:
+        return "asyncio"
+
+
+def resolve_http(http: str) -> str:
+    """解析 HTTP 协议实现，auto 时优先使用 httptools"""
+    if http != "auto":
+        return http
+    try:
+        import httptools  # noqa: F401
+        return "httptools"
+    except ImportError:
+        return "h11"
+
+
+class Supervisor:
+    """预加载应用后 fork 并看护 uvicorn worker"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.workers: Dict[int, float] = {}  # 进程号 -> 启动时间
+        self.should_exit = False
+
+    def run(self):
+        """启动服务，直到收到退出信号"""
+        args = self.args
+        from metrics import METRICS_DIR, clear_directory, metrics
+        removed = clear_directory(METRICS_DIR)
+        if removed:
+            print(f"已清理 {removed} 个旧的指标文件: {METRICS_DIR}")
+
+        from main import app
+        from holiday_loader import holiday_loader
+        from timing import ACCESS_LOG
+        self.metrics = metrics
+        stats = holiday_loader.preload()
+        print(f"节假日数据预加载完成: {stats['loaded_years']}/{stats['years']} 个年份, 耗时 {stats['warmup_ms']}ms")
+
+        self.config = uvicorn.Config(
+            app,
+            host=args.host,
+            port=args.port,
+            loop=args.loop,
+            http=args.http,
+            lifespan="on",
+            timeout_keep_alive=args.keep_alive,
+            backlog=args.backlog,
+            limit_concurrency=args.limit_concurrency or None,
+            timeout_graceful_shutdown=args.graceful_timeout,
+            # 客户端IP由 ClientIPMiddleware 按受信任代理列表解析，不让 uvicorn 提前改写直连地址
+            proxy_headers=False,
+            # 启用了 JSON 访问日志（timing.py）时关闭 uvicorn 自带的访问日志，避免每个请求记录两次
+            access_log=not ACCESS_LOG,
+            log_level="info",
+        )
+        self.socket = self.config.bind_socket()
+        print(f"启动 {args.workers} 个 worker: loop={args.loop}, http={args.http}, "
+              f"limit_concurrency={args.limit_concurrency or '不限'}, max_requests={args.max_requests or '不限'}")
+
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self._handle_exit)
+
+        gc.freeze()
+        for _ in range(args.workers):
+            self.spawn()
+
+        while not self.should_exit:
+            self.reap()
+            time.sleep(0.2)
+        self.shutdown()
+
+    def _handle_exit(self, signum, frame):
+        self.should_exit = True
+
+    def spawn(self):
+        """fork 一个 worker"""
+        max_requests = None
+        if self.args.max_requests:
+            max_requests = self.args.max_requests + random.randint(0, self.args.max_requests_jitter)
+
+        pid = os.fork()
+        if pid == 0:
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(sig, signal.SIG_DFL)
+            self.config.limit_max_requests = max_requests
+            try:
+                uvicorn.Server(self.config).run(sockets=[self.socket])
+            finally:
+                os._exit(0)
+        self.workers[pid] = time.monotonic()
+
+    def reap(self):
+        """回收退出的 worker 并补起新的 worker"""
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            if started is None:
+                continue
+            # 把退出 worker 的计数器并入汇总文件并删除它的指标文件，避免文件随 worker 重启不断增多
+            try:
+                self.metrics.merge_process(pid)
+            except OSError as e:
+                print(f"worker {pid} 的指标文件合并失败: {e}")
+            if self.should_exit:
+                continue
+            code = os.waitstatus_to_exitcode(status) if hasattr(os, "waitstatus_to_exitcode") else status
+            if code != 0:
+                print(f"worker {pid} 异常退出（退出码 {code}），重新启动")
+            if time.monotonic() - started < _MIN_WORKER_LIFETIME:
+                time.sleep(_MIN_WORKER_LIFETIME)
+            self.spawn()
+
+    def shutdown(self):
+        """通知全部 worker 优雅退出，超时后强制结束"""
+        print(f"正在停止 {len(self.workers)} 个 worker...")
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self.socket.close()
+
+
+def main():
+    """命令行入口，参数默认值取自环境变量"""
+    parser = argparse.ArgumentParser(description="API信息查看平台生产环境启动器")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY, help="worker 数量，默认与 CPU 核数相同")
+    parser.add_argument("--loop", default=UVICORN_LOOP, choices=["auto", "asyncio", "uvloop"])
+    parser.add_argument("--http", default=UVICORN_HTTP, choices=["auto", "h11", "httptools"])
+    parser.add_argument("--keep-alive", type=int, default=KEEP_ALIVE, help="keep-alive 空闲超时（秒）")
+    parser.add_argument("--backlog", type=int, default=BACKLOG, help="监听队列长度")
+    parser.add_argument("--limit-concurrency", type=int, default=LIMIT_CONCURRENCY,
+                        help="每个 worker 的最大并发连接数，超过时返回 503，0 表示不限制")
+    parser.add_argument("--max-requests", type=int, default=MAX_REQUESTS,
+                        help="worker 处理多少个请求后优雅重启，0 表示不重启")
+    parser.add_argument("--max-requests-jitter", type=int, default=MAX_REQUESTS_JITTER,
+                        help="重启阈值上增加的最大随机数")
+    parser.add_argument("--graceful-timeout", type=int, default=GRACEFUL_TIMEOUT,
+                        help="停止时等待进行中请求完成的时间（秒）")
+    args = parser.parse_args()
+    args.workers = max(1, args.workers)
+    args.loop = resolve_loop(args.loop)
+    args.http = resolve_http(args.http)
+
+    if not hasattr(os, "fork"):
+        # 不支持 fork 的平台退回 uvicorn 自带的多 worker 模式，不共享预加载数据，也不重启 worker
+        print("当前平台不支持 fork，使用 uvicorn 多 worker 模式")
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers, loop=args.loop,
+                    http=args.http, timeout_keep_alive=args.keep_alive, backlog=args.backlog,
+                    limit_concurrency=args.limit_concurrency or None, proxy_headers=False)
+        return
+
+    Supervisor(args).run()
+
+
+if __name__ == "__main__":
+    main()
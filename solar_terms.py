@@ -0,0 +1,226 @@
+"""
+二十四节气
+
+按太阳视黄经计算每个节气的交节时刻（北京时间）：地球日心黄经采用 Meeus《天文算法》
+附录中的 VSOP87 简化级数，再加入 FK5 修正、章动、光行差和 ΔT，精度在1分钟以内。
+每个年份只计算一次并缓存为24个日期的表，单个日期的查询只需一次二分查找。
+"""
+
+import math
+import threading
+from bisect import bisect_right
+from datetime import date
+from typing import Dict, Any, Optional, List, Tuple
+
+# 按公历年内顺序排列，从小寒（太阳黄经285°）开始，每个节气相差15°
+SOLAR_TERM_NAMES = (
+    "小寒", "大寒", "立春", "雨水", "惊蛰", "春分",
+    "清明", "谷雨", "立夏", "小满", "芒种", "夏至",
+    "小暑", "大暑", "立秋", "处暑", "白露", "秋分",
+    "寒露", "霜降", "立冬", "小雪", "大雪", "冬至",
+)
+
+SOLAR_TERM_MIN_YEAR = 1900
+SOLAR_TERM_MAX_YEAR = 2100
+
+_J2000 = 2451545.0           # 2000-01-01 12:00 的儒略日
+_J2000_MIDNIGHT_ORDINAL = date(2000, 1, 1).toordinal()
+_TROPICAL_YEAR = 365.242189
+_BEIJING_OFFSET = 8 / 24
+
+_year_cache: Dict[int, Tuple[Tuple[int, ...], Tuple[date, ...]]] = {}
+_cache_lock = threading.Lock()
+
+
+# VSOP87 地球日心黄经简化级数（Meeus《天文算法》附录III），每项为 (A, B, C)，
+# 取值为 A * cos(B + C * tau)，单位 1e-8 弧度，tau 为自J2000起的儒略千年数
+_EARTH_L0 = (
+    (175347046, 0, 0), (3341656, 4.6692568, 6283.07585), (34894, 4.6261, 12566.1517),
+    (3497, 2.7441, 5753.3849), (3418, 2.8289, 3.5231), (3136, 3.6277, 77713.7715),
+    (2676, 4.4181, 7860.4194), (2343, 6.1352, 3930.2097), (1324, 0.7425, 11506.7698),
+    (1273, 2.0371, 529.691), (1199, 1.1096, 1577.3435), (990, 5.233, 5884.927),
+    (902, 2.045, 26.298), (857, 3.508, 398.149), (780, 1.179, 5223.694), (753, 2.533, 5507.553),
+    (505, 4.583, 18849.228), (492, 4.205, 775.523), (357, 2.92, 0.067), (317, 5.849, 11790.629),
+    (284, 1.899, 796.298), (271, 0.315, 10977.079), (243, 0.345, 5486.778), (206, 4.806, 2544.314),
+    (205, 1.869, 5573.143), (202, 2.458, 6069.777), (156, 0.833, 213.299), (132, 3.411, 2942.463),
+    (126, 1.083, 20.775), (115, 0.645, 0.98), (103, 0.636, 4694.003), (102, 0.976, 15720.839),
+    (102, 4.267, 7.114), (99, 6.21, 2146.17), (98, 0.68, 155.42), (86, 5.98, 161000.69),
+    (85, 1.3, 6275.96), (85, 3.67, 71430.7), (80, 1.81, 17260.15), (79, 3.04, 12036.46),
+    (75, 1.76, 5088.63), (74, 3.5, 3154.69), (74, 4.68, 801.82), (70, 0.83, 9437.76),
+    (62, 3.98, 8827.39), (61, 1.82, 7084.9), (57, 2.78, 6286.6), (56, 4.39, 14143.5),
+    (56, 3.47, 6279.55), (52, 0.19, 12139.55), (52, 1.33, 1748.02), (51, 0.28, 5856.48),
+    (49, 0.49, 1194.45), (41, 5.37, 8429.24), (41, 2.4, 19651.05), (39, 6.17, 10447.39),
+    (37, 6.04, 10213.29), (37, 2.57, 1059.38), (36, 1.71, 2352.87), (36, 1.78, 6812.77),
+    (33, 0.59, 17789.85), (30, 0.44, 83996.85), (30, 2.74, 1349.87), (25, 3.16, 4690.48),
+)
+_EARTH_L1 = (
+    (628331966747, 0, 0), (206059, 2.678235, 6283.07585), (4303, 2.6351, 12566.1517),
+    (425, 1.59, 3.523), (119, 5.796, 26.298), (109, 2.966, 1577.344), (93, 2.59, 18849.23),
+    (72, 1.14, 529.69), (68, 1.87, 398.15), (67, 4.41, 5507.55), (59, 2.89, 5223.69),
+    (56, 2.17, 155.42), (45, 0.4, 796.3), (36, 0.47, 775.52), (29, 2.65, 7.11), (21, 5.34, 0.98),
+    (19, 1.85, 5486.78), (19, 4.97, 213.3), (17, 2.99, 6275.96), (16, 0.03, 2544.31),
+    (16, 1.43, 2146.17), (15, 1.21, 10977.08), (12, 2.83, 1748.02), (12, 3.26, 5088.63),
+    (12, 5.27, 1194.45), (12, 2.08, 4694.0), (11, 0.77, 553.57), (10, 1.3, 6286.6),
+    (10, 4.24, 1349.87), (9, 2.7, 242.73), (9, 5.64, 951.72), (8, 5.3, 2352.87), (6, 2.65, 9437.76),
+    (6, 4.67, 4690.48),
+)
+_EARTH_L2 = (
+    (52919, 0, 0), (8720, 1.0721, 6283.0758), (309, 0.867, 12566.152), (27, 0.05, 3.52),
+    (16, 5.19, 26.3), (16, 3.68, 155.42), (10, 0.76, 18849.23), (9, 2.06, 77713.77),
+    (7, 0.83, 775.52), (5, 4.66, 1577.34), (4, 1.03, 7.11), (4, 3.44, 5573.14), (3, 5.14, 796.3),
+    (3, 6.05, 5507.55), (3, 1.19, 242.73), (3, 6.12, 529.69), (3, 0.31, 398.15), (3, 2.28, 553.57),
+    (2, 4.38, 5223.69), (2, 3.75, 0.98),
+)
+_EARTH_L3 = (
+    (289, 5.844, 6283.076), (35, 0, 0), (17, 5.49, 12566.15), (3, 5.2, 155.42), (1, 4.72, 3.52),
+    (1, 5.3, 18849.23), (1, 5.97, 242.73),
+)
+_EARTH_L4 = (
+    (114, 3.142, 0), (8, 4.13, 6283.08), (1, 3.84, 12566.15),
+)
+_EARTH_L5 = (
+    (1, 3.14, 0),
+)
+_EARTH_L = (_EARTH_L0, _EARTH_L1, _EARTH_L2, _EARTH_L3, _EARTH_L4, _EARTH_L5)
+
+
+def _sun_apparent_longitude(jd: float) -> float:
+    """计算力学时儒略日对应的太阳视黄经（度）"""
+    tau = (jd - _J2000) / 365250
+    earth_longitude = 0.0
+    for power, series in enumerate(_EARTH_L):
+        earth_longitude += sum(a * math.cos(b + c * tau) for a, b, c in series) * tau ** power
+    longitude = math.degrees(earth_longitude / 1e8) + 180
+
+    # FK5 修正、章动（主要四项）和光行差，单位为角秒
+    t = tau * 10
+    omega = math.radians(125.04452 - 1934.136261 * t)
+    sun_mean = math.radians(280.4665 + 36000.7698 * t)
+    moon_mean = math.radians(218.3165 + 481267.8813 * t)
+    nutation = (
+        -17.20 * math.sin(omega) - 1.32 * math.sin(2 * sun_mean)
+        - 0.23 * math.sin(2 * moon_mean) + 0.21 * math.sin(2 * omega)
+    )
+    return (longitude + (nutation - 0.09033 - 20.4898) / 3600) % 360
+
+
+def _delta_t(year: float) -> float:
+    """力学时与世界时之差 ΔT（秒），采用 Espenak 与 Meeus 的多项式拟合"""
+    if year < 1920:
+        t = year - 1900
+        return -2.79 + 1.494119 * t - 0.0598939 * t ** 2 + 0.0061966 * t ** 3 - 0.000197 * t ** 4
+    if year < 1941:
+        t = year - 1920
+        return 21.20 + 0.84493 * t - 0.076100 * t ** 2 + 0.0020936 * t ** 3
+    if year < 1961:
+        t = year - 1950
+        return 29.07 + 0.407 * t - t ** 2 / 233 + t ** 3 / 2547
+    if year < 1986:
+        t = year - 1975
+        return 45.45 + 1.067 * t - t ** 2 / 260 - t ** 3 / 718
+    if year < 2005:
+        t = year - 2000
+        return (63.86 + 0.3345 * t - 0.060374 * t ** 2 + 0.0017275 * t ** 3
+                + 0.000651814 * t ** 4 + 0.00002373599 * t ** 5)
+    if year < 2050:
+        t = year - 2000
+        return 62.92 + 0.32217 * t + 0.005589 * t ** 2
+    return -20 + 32 * ((year - 1820) / 100) ** 2 - 0.5628 * (2150 - year)
+
+
+def _term_julian_day(year: int, index: int) -> float:
+    """用牛顿迭代求指定年份第 index 个节气的交节儒略日"""
+    target = (285 + 15 * index) % 360
+    # 初值：小寒约在1月6日，此后每个节气约间隔15.2天
+    jd = _J2000 + (date(year, 1, 6).toordinal() - _J2000_MIDNIGHT_ORDINAL) + index * _TROPICAL_YEAR / 24
+    for _ in range(10):
+        delta = (target - _sun_apparent_longitude(jd) + 180) % 360 - 180
+        jd += delta / 360 * _TROPICAL_YEAR
+        if abs(delta) < 1e-7:
+            break
+    return jd
+
+
+def _julian_day_to_beijing_date(jd: float) -> date:
+    """力学时儒略日转换为北京时间的日期"""
+    jd -= _delta_t(2000 + (jd - _J2000) / 365.25) / 86400
+    return date.fromordinal(_J2000_MIDNIGHT_ORDINAL + math.floor(jd - (_J2000 - 0.5) + _BEIJING_OFFSET))
+
+
+def _get_year_table(year: int) -> Tuple[Tuple[int, ...], Tuple[date, ...]]:
+    """获取指定年份24个节气的 (日期序数, 日期) 表，首次访问时计算并缓存"""
+    table = _year_cache.get(year)
+    if table is None:
+        with _cache_lock:
+            table = _year_cache.get(year)
+            if table is None:
+                dates = tuple(_julian_day_to_beijing_date(_term_julian_day(year, index)) for index in range(24))
+                table = (tuple(d.toordinal() for d in dates), dates)
+                _year_cache[year] = table
+    return table
+
+
+def _check_year(year: int):
+    """检查年份是否在支持范围内"""
+    if not SOLAR_TERM_MIN_YEAR <= year <= SOLAR_TERM_MAX_YEAR:
+        raise ValueError(f"节气计算仅支持 {SOLAR_TERM_MIN_YEAR} 至 {SOLAR_TERM_MAX_YEAR} 年")
+
+
+def get_solar_terms(year: int) -> List[Tuple[str, date]]:
+    """
+    获取指定年份的二十四节气
+
+    Args:
+        year: 公历年份
+
+    Returns:
+        按时间顺序排列的 (节气名称, 交节日期) 列表
+
+    Raises:
+        ValueError: 年份超出支持范围
+    """
+    _check_year(year)
+    _, dates = _get_year_table(year)
+    return list(zip(SOLAR_TERM_NAMES, dates))
+
+
+def get_solar_term_info(check_date: date) -> Optional[Dict[str, Any]]:
+    """
+    获取指定日期所处的节气
+
+    Args:
+        check_date: 要检查的日期
+
+    Returns:
+        包含当前节气、是否交节当天以及下一个节气的字典，超出支持范围时为 None
+    """
+    year = check_date.year
+    if not SOLAR_TERM_MIN_YEAR <= year <= SOLAR_TERM_MAX_YEAR:
+        return None
+
+    ordinals, dates = _get_year_table(year)
+    index = bisect_right(ordinals, check_date.toordinal()) - 1
+
+    if index < 0:
+        # 小寒之前仍处于上一年的冬至
+        current_name, current_date = SOLAR_TERM_NAMES[-1], (
+            _get_year_table(year - 1)[1][-1] if year > SOLAR_TERM_MIN_YEAR else None
+        )
+    else:
+        current_name, current_date = SOLAR_TERM_NAMES[index], dates[index]
+
+    if index + 1 < len(dates):
+        next_name, next_date = SOLAR_TERM_NAMES[index + 1], dates[index + 1]
+    elif year < SOLAR_TERM_MAX_YEAR:
+        next_name, next_date = SOLAR_TERM_NAMES[0], _get_year_table(year + 1)[1][0]
+    else:
+        next_name, next_date = SOLAR_TERM_NAMES[0], None
+
+    return {
+        "name": current_name,
+        "date": current_date.strftime("%Y-%m-%d") if current_date else None,
+        "is_term_day": current_date == check_date,
+        "next_name": next_name,
+        "next_date": next_date.strftime("%Y-%m-%d") if next_date else None,
+        "days_to_next": (next_date - check_date).days if next_date else None
+    }
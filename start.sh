@@ -22,6 +22,10 @@ source venv/bin/activate
 echo "📥 安装依赖包..."
 pip install -r requirements.txt
 
+# 生成节假日数据快照
+echo "🗂️ 编译节假日数据快照..."
+python holiday_snapshot.py
+
 # 启动服务
 echo "🌟 启动服务..."
 echo "📍 访问地址: http://localhost:8080"
@@ -29,4 +33,5 @@ echo "📖 API文档: http://localhost:8080/docs"
 echo "⏹️  按 Ctrl+C 停止服务"
 echo ""
 
-python main.py 
\ No newline at end of file
+# 生产模式：预加载数据后按 CPU 核数 fork 多个 worker；开发时可运行 python main.py（自动重载）
+python serve.py 
\ No newline at end of file
@@ -9,15 +9,15 @@ import time
 
 BASE_URL = "http://localhost:8080"
 
-def test_endpoint(endpoint, method="GET", data=None):
+def test_endpoint(endpoint, method="GET", data=None, headers=None):
     """测试API端点"""
     url = f"{BASE_URL}{endpoint}"
     
     try:
         if method == "GET":
-            response = requests.get(url)
+            response = requests.get(url, headers=headers)
         elif method == "POST":
-            response = requests.post(url, json=data)
+            response = requests.post(url, json=data, headers=headers)
         
         print(f"\n🔍 测试 {method} {endpoint}")
         print(f"📊 状态码: {response.status_code}")
@@ -52,6 +52,24 @@ def main():
         test_endpoint(endpoint, method)
         time.sleep(1)  # 避免请求过快
     
+    # 测试伪造代理头：本机作为受信任代理只追加 X-Forwarded-For，客户端自带的 Forwarded/X-Real-IP 不应被采信
+    print("\n🛡️ 测试伪造代理头:")
+    try:
+        response = requests.get(f"{BASE_URL}/ip", headers={
+            "X-Forwarded-For": "203.0.113.7",
+            "Forwarded": "for=8.8.8.8",
+            "X-Real-IP": "8.8.4.4"
+        })
+        client_ip = response.json()["client_ip"]
+        print(f"📍 解析出的客户端IP: {client_ip}")
+        assert client_ip == "203.0.113.7", client_ip
+        response = requests.get(f"{BASE_URL}/ip", headers={"X-Real-IP": "8.8.4.4"})
+        client_ip = response.json()["client_ip"]
+        print(f"📍 只有 X-Real-IP 时: {client_ip}")
+        assert client_ip != "8.8.4.4", client_ip
+    except requests.exceptions.ConnectionError:
+        print(f"❌ 连接失败: 请确保服务已启动在 {BASE_URL}")
+    
     # 测试指定日期的时间接口
     test_dates = [
         "/time/2024-01-01",  # 元旦
@@ -66,6 +84,17 @@ def main():
         test_endpoint(date_endpoint, "GET")
         time.sleep(0.5)
     
+    # 测试User-Agent解析
+    test_user_agents = [
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.2210.91",
+        "Mozilla/5.0 (iPhone; CPU iPhone OS 17_1_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1.2 Mobile/15E148 Safari/604.1",
+        "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
+    ]
+    
+    print("\n🕵️ 测试User-Agent解析:")
+    for user_agent in test_user_agents:
+        test_endpoint("/user-agent", "GET", headers={"User-Agent": user_agent})
+    
     # 测试POST端点
     test_data = {
         "message": "Hello from test script!",
@@ -74,6 +103,53 @@ def main():
     }
     test_endpoint("/echo", "POST", test_data)
     
+    # 摘要模式不回显敏感请求头的值
+    print("\n🔒 测试回显敏感请求头:")
+    try:
+        secret = "Bearer echo-test-secret"
+        response = requests.post(f"{BASE_URL}/echo", json=test_data,
+                                 headers={"Authorization": secret, "Cookie": "session=echo-test-secret"})
+        print(f"📋 authorization: {response.json()['headers'].get('authorization')}")
+        assert "echo-test-secret" not in response.text
+    except requests.exceptions.ConnectionError:
+        print(f"❌ 连接失败: 请确保服务已启动在 {BASE_URL}")
+    
+    # 测试文本、二进制和超长请求体的回显
+    print("\n📨 测试请求体回显:")
+    for content, content_type in [
+        ("你好, echo!".encode("utf-8"), "text/plain; charset=utf-8"),
+        (bytes(range(256)), "application/octet-stream"),
+        (b"x" * (11 * 1024 * 1024), "application/octet-stream"),
+    ]:
+        try:
+            response = requests.post(f"{BASE_URL}/echo", data=content, headers={"Content-Type": content_type})
+            print(f"📊 {content_type} {len(content)} 字节 -> 状态码: {response.status_code}")
+            if response.status_code == 200:
+                print(json.dumps(response.json()["data"], indent=2, ensure_ascii=False)[:500])
+        except requests.exceptions.ConnectionError:
+            print(f"❌ 连接失败: 请确保服务已启动在 {BASE_URL}")
+    
+    # 测试分阶段计时（Server-Timing 响应头，服务端需设置 SERVER_TIMING=1，默认不返回）
+    print("\n⏱️ 测试分阶段计时:")
+    try:
+        response = requests.get(f"{BASE_URL}/time/2024-10-01")
+        print(f"📊 Server-Timing: {response.headers.get('server-timing')}")
+    except requests.exceptions.ConnectionError:
+        print(f"❌ 连接失败: 请确保服务已启动在 {BASE_URL}")
+    
+    # 测试监控指标（Prometheus 文本格式）
+    print("\n📈 测试监控指标:")
+    try:
+        response = requests.get(f"{BASE_URL}/metrics")
+        print(f"📊 状态码: {response.status_code}")
+        print(f"📄 Content-Type: {response.headers.get('content-type')}")
+        assert response.headers.get("content-type") == "text/plain; version=0.0.4; charset=utf-8"
+        for line in response.text.splitlines():
+            if line.startswith(("http_requests_total", "holiday_loader_")):
+                print(line)
+    except requests.exceptions.ConnectionError:
+        print(f"❌ 连接失败: 请确保服务已启动在 {BASE_URL}")
+    
     print("\n✅ 测试完成!")
     print(f"🌐 访问主页: {BASE_URL}")
     print(f"📖 查看API文档: {BASE_URL}/docs")
@@ -3,21 +3,26 @@
 节假日功能测试脚本
 """
 
+import os
 import requests
 import json
+import shutil
+import tempfile
+import threading
 from datetime import date, timedelta
 
 BASE_URL = "http://localhost:8080"
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
 
-def test_endpoint(endpoint, method="GET", data=None):
+def test_endpoint(endpoint, method="GET", data=None, headers=None):
     """测试API端点"""
     url = f"{BASE_URL}{endpoint}"
     
     try:
         if method == "GET":
-            response = requests.get(url)
+            response = requests.get(url, headers=headers)
         elif method == "POST":
-            response = requests.post(url, json=data)
+            response = requests.post(url, json=data, headers=headers)
         
         print(f"\n🔍 测试 {method} {endpoint}")
         print(f"📊 状态码: {response.status_code}")
@@ -34,12 +39,60 @@ def test_endpoint(endpoint, method="GET", data=None):
     except Exception as e:
         print(f"❌ 测试失败: {e}")
 
+def test_reload_race():
+    """热更新与懒加载交错：懒加载读到旧文件后才完成时，不能覆盖热更新写入的新数据（进程内测试，不需要服务）"""
+    from holiday_loader import HolidayLoader
+    
+    print("\n🔀 测试热更新与懒加载交错:")
+    holiday_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(holiday_dir, "2024.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"year": 2024, "days": [{"name": "旧数据", "date": "2024-10-01", "isOffDay": True}]}, f)
+        
+        loader = HolidayLoader(holiday_dir)
+        read_year = loader._read_year
+        old_read = threading.Event()
+        resume = threading.Event()
+        calls = []
+        
+        def slow_read_year(year):
+            record = read_year(year)
+            calls.append(record)
+            if len(calls) == 1:
+                # 第一次读取（懒加载）读完旧文件后暂停，等热更新开始后再返回
+                old_read.set()
+                resume.wait(5)
+            return record
+        
+        loader._read_year = slow_read_year
+        lazy = threading.Thread(target=loader.is_holiday, args=(date(2024, 10, 1),))
+        lazy.start()
+        old_read.wait(5)
+        
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"year": 2024, "days": [{"name": "新数据", "date": "2024-10-01", "isOffDay": True},
+                                              {"name": "新数据", "date": "2024-10-02", "isOffDay": True}]}, f)
+        reload = threading.Thread(target=loader.reload_year, args=(2024,))
+        reload.start()
+        reload.join(0.2)  # 热更新应等待懒加载释放加载锁
+        resume.set()
+        lazy.join(5)
+        reload.join(5)
+        
+        name = loader.is_holiday(date(2024, 10, 1))["holiday_name"]
+        print(f"📋 最终数据: {name}")
+        assert name == "新数据", name
+    finally:
+        shutil.rmtree(holiday_dir)
+
 def main():
     """主测试函数"""
     print("🎉 节假日功能测试")
     print("=" * 50)
     
-    # 测试可用年份
+    # 测试就绪探针与可用年份
+    test_endpoint("/ready")
     test_endpoint("/holiday/years")
     
     # 测试节假日检查
@@ -58,6 +111,10 @@ def main():
     for test_date in test_dates:
         test_endpoint(f"/holiday/check/{test_date}")
     
+    # 测试批量节假日检查
+    print("\n📦 测试批量节假日检查:")
+    test_endpoint("/holiday/check", "POST", test_dates + ["2024-13-01"])
+    
     # 测试时间接口（包含节假日信息）
     print("\n⏰ 测试时间接口:")
     test_endpoint("/time")
@@ -70,6 +127,42 @@ def main():
     # 测试年份节假日数据
     print("\n📊 测试年份节假日数据:")
     test_endpoint("/holiday/2024")
+    # 超出日期范围的年份与没有数据文件的年份一样返回空列表
+    test_endpoint("/holiday/0")
+    test_endpoint("/holiday/10000")
+    
+    # 测试工作日推算与统计
+    print("\n🧮 测试工作日计算:")
+    test_endpoint("/workday/add?from=2024-09-28&n=10")
+    test_endpoint("/workday/add?from=2024-10-08&n=-5")
+    test_endpoint("/workday/count?start=2024-01-01&end=2024-12-31")
+    
+    # 测试日期区间日历
+    print("\n🗓️ 测试日期区间日历:")
+    test_endpoint("/calendar?start=2024-09-28&end=2024-10-08")
+    
+    # 测试二十四节气
+    print("\n🌾 测试二十四节气:")
+    test_endpoint("/solar-terms/2024")
+    
+    # 测试数据热更新管理接口（需要与服务端相同的 ADMIN_TOKEN）
+    print("\n🔄 测试数据热更新管理接口:")
+    admin_headers = {"X-Admin-Token": ADMIN_TOKEN}
+    test_endpoint("/admin/holiday/status", headers=admin_headers)
+    test_endpoint("/admin/holiday/reload", "POST", headers=admin_headers)
+    
+    # 测试按请求采样分析（需要管理令牌，return 模式直接返回折叠栈）
+    print("\n🔥 测试按请求采样分析:")
+    try:
+        response = requests.get(f"{BASE_URL}/holiday/2024",
+                                headers={**admin_headers, "X-Profile": "return"})
+        print(f"📊 状态码: {response.status_code}, 原状态码: {response.headers.get('x-profile-status')}, "
+              f"采样次数: {response.headers.get('x-profile-samples')}")
+        print(response.text[:500])
+    except requests.exceptions.ConnectionError:
+        print(f"❌ 连接失败: 请确保服务已启动在 {BASE_URL}")
+    
+    test_reload_race()
     
     print("\n✅ 节假日功能测试完成!")
     print(f"🌐 访问主页: {BASE_URL}")
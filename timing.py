@@ -0,0 +1,220 @@
+"""
+请求分阶段计时
+
+TimingMiddleware 为每个请求在 contextvar 中放一个阶段耗时字典，业务代码用 `with phase("loader"):` 记录
+客户端IP解析、请求头处理、节假日数据查询、农历计算、JSON编码等阶段的耗时，同名阶段累加。
+没有进行中的请求时 phase 只做一次 contextvar 查询，不计时。
+
+设置 SERVER_TIMING=1 时，响应头发出时已记录的阶段和截至此时的总耗时写入 Server-Timing 头，浏览器开发者工具可直接查看；
+设置 ACCESS_LOG=1 时，请求结束后整条记录（含流式响应发送期间的阶段）以 JSON 行写入访问日志。两者默认关闭。
+访问日志经有界队列交给后台线程编码和写出，事件循环上不做同步 I/O；队列满时丢弃并计数。
+"""
+
+import json
+import logging
+import os
+import queue
+import sys
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, Optional
+
+# 是否在响应中添加 Server-Timing 头；会向所有客户端暴露内部耗时，默认关闭，只在排查性能问题时开启
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") not in ("0", "false", "False")
+# 是否输出 JSON 访问日志，以及日志文件（为空时写到标准输出）；默认关闭，使用 uvicorn 自带的访问日志
+ACCESS_LOG = os.getenv("ACCESS_LOG", "0") not in ("0", "false", "False")
+ACCESS_LOG_FILE = os.getenv("ACCESS_LOG_FILE", "")
+# 访问日志队列的最大长度
+ACCESS_LOG_QUEUE_SIZE = int(os.getenv("ACCESS_LOG_QUEUE_SIZE", "10000"))
+
+# 当前请求的 阶段名 -> 累计耗时（秒），不在请求中时为 None
+_phases: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_phases", default=None)
+
+
+class _Phase:
+    """累加一个阶段耗时的上下文管理器"""
+
+    __slots__ = ("name", "phases", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.phases = _phases.get()
+        if self.phases is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        phases = self.phases
+        if phases is not None:
+            phases[self.name] = phases.get(self.name, 0.0) + time.perf_counter() - self.started
+        return False
+
+
+def phase(name: str) -> _Phase:
+    """
+    记录当前请求中一个阶段的耗时
+
+    Args:
+        name: 阶段名，需符合 Server-Timing 的 token 格式（字母、数字、下划线等）
+
+    Returns:
+        上下文管理器
+    """
+    return _Phase(name)
+
+
+def format_server_timing(phases: Dict[str, float], total: float) -> bytes:
+    """
+    生成 Server-Timing 头的值
+
+    Args:
+        phases: 阶段名 -> 耗时（秒）
+        total: 总耗时（秒）
+
+    Returns:
+        形如 `loader;dur=0.120, json;dur=0.045, total;dur=0.512` 的头部值，单位为毫秒
+    """
+    items = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in phases.items()]
+    items.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(items).encode("latin-1")
+
+
+class _RecordQueueHandler(QueueHandler):
+    """入队时不格式化日志记录，JSON 编码留给写日志线程；队列满时丢弃"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _JSONFormatter(logging.Formatter):
+    """把字典形式的日志消息编码为一行 JSON，加上记录时间"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds")}
+        entry.update(record.msg)
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+
+
+class AccessLog:
+    """经队列异步写出的 JSON 访问日志"""
+
+    def __init__(self, path: str = ACCESS_LOG_FILE, queue_size: int = ACCESS_LOG_QUEUE_SIZE):
+        """
+        Args:
+            path: 日志文件，为空时写到标准输出
+            queue_size: 队列的最大长度
+        """
+        self.path = path
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.handler = _RecordQueueHandler(self.queue)
+        self.logger = logging.getLogger("api.access")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.logger.addHandler(self.handler)
+        self._target: Optional[logging.Handler] = None
+        self._listener: Optional[QueueListener] = None
+
+    def start(self):
+        """启动写日志线程，多 worker 部署时在每个 worker 中启动"""
+        if self._listener is not None:
+            return
+        if self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._target = logging.FileHandler(self.path, encoding="utf-8")
+        else:
+            self._target = logging.StreamHandler(sys.stdout)
+        self._target.setFormatter(_JSONFormatter())
+        self._listener = QueueListener(self.queue, self._target)
+        self._listener.start()
+
+    def stop(self):
+        """写出队列中剩余的日志并停止写日志线程"""
+        if self._listener is None:
+            return
+        self._listener.stop()
+        self._listener = None
+        self._target.close()
+        self._target = None
+
+    @property
+    def dropped(self) -> int:
+        """因队列满而丢弃的日志条数"""
+        return self.handler.dropped
+
+    def log(self, entry: Dict[str, Any]):
+        """提交一条访问日志"""
+        self.logger.info(entry)
+
+
+class TimingMiddleware:
+    """记录每个请求的分阶段耗时，输出 Server-Timing 头和访问日志"""
+
+    def __init__(self, app, server_timing: bool = SERVER_TIMING, access_log: Optional[AccessLog] = None):
+        """
+        Args:
+            app: ASGI 应用
+            server_timing: 是否添加 Server-Timing 头
+            access_log: 访问日志，为 None 时不记录
+        """
+        self.app = app
+        self.server_timing = server_timing
+        self.access_log = access_log
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        phases: Dict[str, float] = {}
+        token = _phases.set(phases)
+        started = time.perf_counter()
+        status = 500
+        sent = 0
+
+        async def send_wrapper(message):
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", format_server_timing(phases, time.perf_counter() - started))
+                    ]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _phases.reset(token)
+            if self.access_log is not None:
+                route = scope.get("route")
+                self.access_log.log({
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(route, "path", None),
+                    "status": status,
+                    "client_ip": scope.get("state", {}).get("client_ip"),
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                    "bytes": sent,
+                    "phases": {name: round(seconds * 1000, 3) for name, seconds in phases.items()},
+                    "pid": os.getpid()
+                })
+
+
+# 全局实例，未启用时为 None
+access_log = AccessLog() if ACCESS_LOG else None
@@ -0,0 +1,180 @@
+"""
+User-Agent 解析
+
+一次正则扫描提取 UA 中全部的 产品/版本 标记和平台标记，再按优先级查表得到浏览器、操作系统和设备类型，
+避免 "Chrome 的 UA 含 Safari"、"Edge 的 UA 含 Chrome"、"iOS 的 UA 含 Mac" 这类子串误判。
+解析结果按原始 UA 字符串缓存，真实流量中不同的 UA 很少，重复的 UA 只需一次字典查找。
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
+
+# 解析结果缓存的最大条目数
+UA_CACHE_SIZE = int(os.getenv("UA_CACHE_SIZE", "1024"))
+# 只解析 UA 的前若干个字符，防止超长请求头拖慢正则
+MAX_UA_LENGTH = 1024
+
+# 产品/版本 标记，如 Chrome/120.0.0.0、Version/17.0
+_PRODUCT_RE = re.compile(r"([A-Za-z][\w.-]*)/(\d[\w.]*)")
+
+# 平台标记，一次扫描收集全部命中的分组后按优先级选择
+_PLATFORM_RE = re.compile(
+    r"(?P<windows_phone>Windows Phone(?: OS)? ?(?P<windows_phone_version>[\d.]*))"
+    r"|(?P<windows>Windows NT (?P<windows_version>[\d.]+))"
+    r"|(?P<ios>(?:iPhone|CPU) OS (?P<ios_version>\d+(?:_\d+)*))"
+    r"|(?P<harmony>HarmonyOS[ /]?(?P<harmony_version>[\d.]*))"
+    r"|(?P<android>Android[ /]?(?P<android_version>[\d.]*))"
+    r"|(?P<chrome_os>CrOS \S+ (?P<chrome_os_version>[\d.]+))"
+    r"|(?P<macos>Mac OS X (?P<macos_version>\d+(?:[_.]\d+)*))"
+    r"|(?P<linux>Linux)"
+    r"|(?P<iphone>iPhone|iPod)"
+    r"|(?P<ipad>iPad)"
+    r"|(?P<tablet>Tablet)"
+    r"|(?P<mobile>Mobile)"
+)
+
+# 爬虫、无头浏览器和HTTP客户端库
+_BOT_RE = re.compile(
+    r"(?<!cu)bot\b|bot/|crawl|spider|slurp|bingpreview|mediapartners|facebookexternalhit|lighthouse|headless"
+    r"|^(?:curl|wget|python-requests|python-urllib|python-httpx|aiohttp|go-http-client|okhttp|java|axios"
+    r"|postmanruntime|apache-httpclient|libwww-perl)/",
+    re.IGNORECASE
+)
+
+# 浏览器标记，按优先级排列：基于 Chromium 的浏览器都带 Chrome 标记，Chrome 又带 Safari 标记
+_BROWSER_TOKENS = (
+    ("Edg", "Edge"),
+    ("EdgA", "Edge"),
+    ("EdgiOS", "Edge"),
+    ("Edge", "Edge"),
+    ("OPR", "Opera"),
+    ("OPT", "Opera"),
+    ("Opera", "Opera"),
+    ("MicroMessenger", "WeChat"),
+    ("QQBrowser", "QQ Browser"),
+    ("UCBrowser", "UC Browser"),
+    ("YaBrowser", "Yandex Browser"),
+    ("SamsungBrowser", "Samsung Internet"),
+    ("Vivaldi", "Vivaldi"),
+    ("FxiOS", "Firefox"),
+    ("Firefox", "Firefox"),
+    ("CriOS", "Chrome"),
+    ("HeadlessChrome", "Headless Chrome"),
+    ("Chromium", "Chromium"),
+    ("Chrome", "Chrome"),
+)
+
+# IE 不使用 产品/版本 格式
+_IE_RE = re.compile(r"MSIE (\d[\d.]*)|Trident/.*?rv:(\d[\d.]*)")
+
+# Windows NT 内核版本 -> 发行版本
+_WINDOWS_VERSIONS = {
+    "10.0": "10",
+    "6.3": "8.1",
+    "6.2": "8",
+    "6.1": "7",
+    "6.0": "Vista",
+    "5.2": "XP",
+    "5.1": "XP",
+}
+
+
+@lru_cache(maxsize=UA_CACHE_SIZE)
+def parse_user_agent(user_agent: str) -> Dict[str, Any]:
+    """
+    解析User-Agent信息
+
+    Args:
+        user_agent: 原始 User-Agent 字符串
+
+    Returns:
+        包含 browser、browser_version、os、os_version、device、is_bot 的字典（只读的共享对象，请勿修改）
+    """
+    ua = user_agent[:MAX_UA_LENGTH]
+
+    products = {}
+    for name, version in _PRODUCT_RE.findall(ua):
+        products.setdefault(name, version)
+
+    platform = {}
+    for match in _PLATFORM_RE.finditer(ua):
+        for key, value in match.groupdict().items():
+            if value is not None:
+                platform.setdefault(key, value)
+
+    bot_match = _BOT_RE.search(ua)
+    is_bot = bot_match is not None
+
+    browser, browser_version = _detect_browser(ua, products, bot_match)
+    os_name, os_version = _detect_os(platform)
+
+    if is_bot:
+        device = "Bot"
+    elif "ipad" in platform or "tablet" in platform or ("android" in platform and "mobile" not in platform):
+        device = "Tablet"
+    elif "iphone" in platform or "mobile" in platform or "windows_phone" in platform:
+        device = "Mobile"
+    elif os_name in ("Windows", "macOS", "Linux", "Chrome OS"):
+        device = "Desktop"
+    else:
+        device = "Unknown"
+
+    return {
+        "browser": browser,
+        "browser_version": browser_version,
+        "os": os_name,
+        "os_version": os_version,
+        "device": device,
+        "is_bot": is_bot
+    }
+
+
+def _detect_browser(ua: str, products: Dict[str, str],
+                    bot_match: Optional["re.Match"]) -> Tuple[str, Optional[str]]:
+    """按优先级从产品标记中识别浏览器及版本"""
+    for token, name in _BROWSER_TOKENS:
+        version = products.get(token)
+        if version is not None:
+            return name, version
+
+    if "Safari" in products:
+        return "Safari", products.get("Version")
+
+    ie = _IE_RE.search(ua)
+    if ie:
+        return "Internet Explorer", ie.group(1) or ie.group(2)
+
+    if bot_match is not None:
+        # 爬虫和客户端库以命中的产品标记命名，如 Googlebot/2.1、curl/8.4.0
+        for name, version in products.items():
+            if _BOT_RE.search(f"{name}/"):
+                return name, version
+        if products:
+            name, version = next(iter(products.items()))
+            return name, version
+
+    return "Unknown", None
+
+
+def _detect_os(platform: Dict[str, Optional[str]]) -> Tuple[str, Optional[str]]:
+    """按优先级从平台标记中识别操作系统及版本"""
+    if "windows_phone" in platform:
+        return "Windows Phone", platform["windows_phone_version"] or None
+    if "windows" in platform:
+        version = platform["windows_version"]
+        return "Windows", _WINDOWS_VERSIONS.get(version, version)
+    if "ios" in platform:
+        return "iOS", platform["ios_version"].replace("_", ".")
+    if "harmony" in platform:
+        return "HarmonyOS", platform["harmony_version"] or None
+    if "android" in platform:
+        return "Android", platform["android_version"] or None
+    if "chrome_os" in platform:
+        return "Chrome OS", platform["chrome_os_version"]
+    if "macos" in platform:
+        return "macOS", platform["macos_version"].replace("_", ".")
+    if "linux" in platform:
+        return "Linux", None
+    return "Unknown", None